@@ -0,0 +1,121 @@
+import argparse
+import sys
+
+from common.bitboard import BitboardTicTacToe
+from common.engine import PLAYER_NAMES, make_player, parse_board
+
+# python -m common bestmove X.O......
+# Este módulo solo importa la biblioteca estándar; NumPy se carga únicamente en `bench`
+# o con jugadores que usan rutas vectorizadas
+
+def add_player_arguments(parser):
+    parser.add_argument('--player', default='solver',
+                        choices=PLAYER_NAMES)
+    parser.add_argument('--param', type=int, help="profundidad o simulaciones")
+    parser.add_argument('--book', help="libro de aperturas consultado antes de buscar")
+
+def bestmove(args):
+    game = parse_board(args.board, args.to_move)
+    if game.game_over:
+        print("partida terminada", file=sys.stderr)
+        return 1
+    move, _ = make_player(args.player, args.param, args.book).get_move(game)
+    print(move[0], move[1])
+    return 0
+
+def play(args):
+    player = make_player(args.player, args.param, args.book)
+    game = BitboardTicTacToe(args.first)
+    while not game.game_over:
+        game.print_board()
+        if game.current_player == args.human:
+            try:
+                i, j = map(int, input(f"{args.human} (fila columna): ").split())
+            except EOFError:
+                return 1
+            except ValueError:
+                print("Jugada inválida")
+                continue
+            if (i, j) not in game.available_moves():
+                print("Jugada inválida")
+                continue
+            game.make_move((i, j))
+        else:
+            move, _ = player.get_move(game)
+            print(f"{game.current_player} juega {move[0]} {move[1]}")
+            game.make_move(move)
+    game.print_board()
+    print(f"Gana {game.winner}" if game.winner else "Empate")
+    return 0
+
+def server(args):
+    import asyncio
+    from common.server import MoveServer, serve
+    move_server = MoveServer(args.player, args.param, args.rollouts, args.workers, args.batch)
+    try:
+        asyncio.run(serve(move_server, args.tcp, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def startup(args):
+    from common.benchmark import measure_startup, write_json
+    row = measure_startup(args.runs, args.board, args.player)
+    print(f"arranque en frío hasta la primera jugada ({args.player}): "
+          f"p50 {row['p50_ms']:.1f} ms | min {row['min_ms']:.1f} ms | max {row['max_ms']:.1f} ms "
+          f"| NumPy importado: {'sí' if row['imports_numpy'] else 'no'}")
+    if args.json:
+        write_json([row], args.json)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m common', description="Motor de Tic-Tac-Toe")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('bestmove', help="mejor jugada para un tablero")
+    p.add_argument('board')
+    p.add_argument('--to-move', choices=('X', 'O'))
+    add_player_arguments(p)
+    p.set_defaults(run=bestmove)
+
+    p = commands.add_parser('play', help="partida contra el motor en la terminal")
+    p.add_argument('--human', default='X', choices=('X', 'O'))
+    p.add_argument('--first', default='X', choices=('X', 'O'))
+    add_player_arguments(p)
+    p.set_defaults(run=play)
+
+    # Los argumentos de `bench` se pasan tal cual a common.benchmark
+    commands.add_parser('bench', help="benchmark de jugadores (argumentos de common.benchmark)",
+                        add_help=False)
+
+    p = commands.add_parser('server', help="servidor de peticiones bestmove (JSON por líneas)")
+    listen = p.add_mutually_exclusive_group()
+    listen.add_argument('--tcp', help="host:puerto; por defecto se leen peticiones de stdin")
+    listen.add_argument('--unix', help="ruta del socket Unix")
+    p.add_argument('--player', default='alphabeta', choices=PLAYER_NAMES)
+    p.add_argument('--param', type=int, help="profundidad o simulaciones")
+    p.add_argument('--rollouts', type=int, help="rollouts vectorizados por hoja (MCTS)")
+    p.add_argument('--workers', type=int, help="procesos de búsqueda (por defecto, uno por núcleo)")
+    p.add_argument('--batch', type=int, default=32, help="peticiones máximas por lote")
+    p.set_defaults(run=server)
+
+    p = commands.add_parser('startup', help="mide el arranque en frío de bestmove")
+    p.add_argument('--runs', type=int, default=10)
+    p.add_argument('--board', default='.........')
+    p.add_argument('--player', default='solver')
+    p.add_argument('--json', help="ruta del informe JSON")
+    p.set_defaults(run=startup)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['bench']:
+        from common.benchmark import main as benchmark_main
+        benchmark_main(argv[1:])
+        return 0
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+if __name__ == '__main__':
+    sys.exit(main())
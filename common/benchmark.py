@@ -0,0 +1,174 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from functools import partial
+
+from common.cache import POSITION_CACHE
+from common.game import TicTacToe
+from common.experiments import run_experiments
+from common.players import AlphaBetaPlayer, MCTSPlayer, MinimaxPlayer, PVSPlayer
+from common.policy import InformedPolicy
+
+# Jugador -> (fábrica, nombre del parámetro barrido)
+PLAYERS = {
+    'minimax':   (partial(MinimaxPlayer, backend='bitboard'), 'max_depth'),
+    'alphabeta': (partial(AlphaBetaPlayer, backend='bitboard'), 'max_depth'),
+    'pvs':       (partial(PVSPlayer, backend='bitboard'), 'max_depth'),
+    'mcts':      (MCTSPlayer, 'num_simulations'),
+    # Simulaciones con la política "gana, si no bloquea, si no al azar ponderado"
+    'mcts-informed': (partial(MCTSPlayer, rollout_policy=InformedPolicy()), 'num_simulations'),
+    'mcts-rave':     (partial(MCTSPlayer, rave=300), 'num_simulations'),
+}
+
+# Configuraciones de EJ_4/conclusiones.txt
+CONCLUSIONES = [('minimax', 1), ('minimax', 2),
+                ('alphabeta', 1), ('alphabeta', 2),
+                ('mcts', 50), ('mcts', 100)]
+
+FIELDS = ['player', 'param', 'first_player', 'trials', 'seed',
+          'wins', 'losses', 'draws', 'win_rate', 'avg_nodes', 'first_move_cutoff_rate', 'moves',
+          'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'nodes_per_sec', 'games_per_sec', 'total_s']
+
+def player_factory(name, param, **options):
+    factory, param_name = PLAYERS[name]
+    return partial(factory, **{param_name: param}, **options)
+
+def percentile(sorted_values, q):
+    # Percentil por rango más cercano sobre valores ya ordenados
+    if not sorted_values:
+        return 0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+# Jugadores que cuentan sus podas (y cuántas produjo la primera jugada probada)
+CUTOFF_COUNTERS = {'alphabeta': ('cutoffs', 'first_move_cutoffs')}
+
+def cutoff_rate(results):
+    # Fracción de las podas producidas por la primera jugada; None si el jugador no las cuenta
+    if 'avg_cutoffs' not in results:
+        return None
+    return results['avg_first_move_cutoffs'] / results['avg_cutoffs'] if results['avg_cutoffs'] else 0.0
+
+def run_case(name, param, first_player='X', num_trials=1000, seed=0, workers=1, **options):
+    # Cada caso empieza con la caché vacía para no heredar aciertos del anterior
+    POSITION_CACHE.clear()
+    results = run_experiments(player_factory(name, param, **options), TicTacToe, first_player,
+                              num_trials, workers=workers, seed=seed, verbose=False,
+                              record_moves=True, counters=CUTOFF_COUNTERS.get(name, ()))
+    times = sorted(results['move_times_ns'])
+    search_time = results['total_search_time']
+    return {
+        'player': name,
+        'param': param,
+        'first_player': first_player,
+        'trials': num_trials,
+        'seed': seed,
+        'wins': results['wins'],
+        'losses': results['losses'],
+        'draws': results['draws'],
+        'win_rate': results['wins'] / num_trials,
+        'avg_nodes': results['avg_nodes'],
+        'first_move_cutoff_rate': cutoff_rate(results),
+        'moves': results['total_moves'],
+        'p50_ms': percentile(times, 50) / 1e6,
+        'p95_ms': percentile(times, 95) / 1e6,
+        'p99_ms': percentile(times, 99) / 1e6,
+        'mean_ms': sum(times) / len(times) / 1e6 if times else 0.0,
+        'nodes_per_sec': results['total_nodes'] / search_time if search_time else 0.0,
+        'games_per_sec': num_trials / results['total_experiment_time'],
+        'total_s': results['total_experiment_time'],
+    }
+
+def run_suite(cases=CONCLUSIONES, first_players=('X', 'O'), num_trials=1000, seed=0, workers=1,
+              verbose=True):
+    rows = []
+    for name, param in cases:
+        for first_player in first_players:
+            row = run_case(name, param, first_player, num_trials, seed, workers)
+            rows.append(row)
+            if verbose:
+                rate = row['first_move_cutoff_rate']
+                cutoffs = f" | poda 1ª {rate:6.1%}" if rate is not None else ""
+                print(f"{name:>13} {param:>4} {first_player} | victorias {row['win_rate']:6.1%} "
+                      f"| nodos {row['avg_nodes']:8.1f}{cutoffs} | p50 {row['p50_ms']:8.3f} ms "
+                      f"| p95 {row['p95_ms']:8.3f} ms | p99 {row['p99_ms']:8.3f} ms "
+                      f"| {row['nodes_per_sec']:10.0f} nodos/s | {row['games_per_sec']:8.1f} partidas/s")
+    return rows
+
+def measure_startup(runs=10, board='.........', player='solver'):
+    """
+    Arranque en frío hasta la primera jugada: lanza `runs` procesos nuevos
+    de `python -m common bestmove` y mide el tiempo total de cada uno. Una
+    ejecución previa, fuera de la medición, genera los ficheros que el
+    jugador necesite (p. ej. la tabla del solver). Otra con -X importtime
+    comprueba si se llega a importar NumPy.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, '-m', 'common', 'bestmove', board, '--player', player]
+    subprocess.run(command, cwd=root, check=True, capture_output=True)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        subprocess.run(command, cwd=root, check=True, capture_output=True)
+        times.append(time.perf_counter_ns() - start)
+    times.sort()
+    imports = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], cwd=root,
+                             check=True, capture_output=True, text=True).stderr
+    return {
+        'command': ' '.join(command[1:]),
+        'runs': runs,
+        'p50_ms': percentile(times, 50) / 1e6,
+        'min_ms': times[0] / 1e6,
+        'max_ms': times[-1] / 1e6,
+        'imports_numpy': any(line.rsplit('|', 1)[-1].strip() == 'numpy'
+                             for line in imports.splitlines()),
+    }
+
+def write_json(rows, path):
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': rows,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def parse_case(text):
+    name, _, param = text.partition(':')
+    return name, int(param)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de jugadores de Tic-Tac-Toe")
+    parser.add_argument('cases', nargs='*', type=parse_case,
+                        help="casos jugador:parámetro (p. ej. alphabeta:2 mcts:50); "
+                             "por defecto los de EJ_4/conclusiones.txt")
+    parser.add_argument('--trials', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--first', default='XO', help="jugadores iniciales a barrer")
+    parser.add_argument('--json', help="ruta del informe JSON")
+    parser.add_argument('--csv', help="ruta del informe CSV")
+    args = parser.parse_args(argv)
+
+    rows = run_suite(args.cases or CONCLUSIONES, tuple(args.first), args.trials, args.seed,
+                     args.workers)
+    if args.json:
+        write_json(rows, args.json)
+    if args.csv:
+        write_csv(rows, args.csv)
+    return rows
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+import random
+
+from common.cache import POSITION_CACHE
+
+LINES = (0b000000111, 0b000111000, 0b111000000,
+         0b001001001, 0b010010010, 0b100100100,
+         0b100010001, 0b001010100)
+CENTER = 1 << 4
+FULL = 0b111111111
+
+MOVES = tuple((b // 3, b % 3) for b in range(9))
+POPCOUNT = tuple(bin(m).count('1') for m in range(512))
+WINNING = tuple(any(m & l == l for l in LINES) for m in range(512))
+FREE_MOVES = tuple(tuple(MOVES[b] for b in range(9) if not occupied >> b & 1)
+                   for occupied in range(512))
+
+# Permutaciones de las 8 simetrías (rotaciones y reflexiones): celda destino -> celda origen
+SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),
+)
+TRANSFORMS = tuple(tuple(sum(1 << dst for dst, src in enumerate(sym) if m >> src & 1)
+                         for m in range(512))
+                   for sym in SYMMETRIES)
+# CELL_MAPS[s][celda original] = celda en el tablero transformado por la simetría s
+CELL_MAPS = tuple(tuple(sym.index(b) for b in range(9)) for sym in SYMMETRIES)
+
+# Hash de Zobrist de 64 bits: un número aleatorio por (jugador, casilla) y otro para "mueve O".
+# Las 8 variantes simétricas del hash (la del tablero transformado por cada simetría) se
+# empaquetan en un entero de 512 bits, con la variante s en los bits 64*s..64*s+63, de modo
+# que un solo XOR por jugada actualiza las 8 y el cambio de turno
+ZOBRIST_MASK = (1 << 64) - 1
+_zobrist_random = random.Random(0x5A0B)
+ZOBRIST_PIECES = {p: tuple(_zobrist_random.getrandbits(64) for _ in range(9)) for p in 'XO'}
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)
+
+def _pack(hashes):
+    return sum(h << 64 * s for s, h in enumerate(hashes))
+
+ZOBRIST_SIDE_KEYS = _pack([ZOBRIST_SIDE] * 8)
+# ZOBRIST_MOVES[jugador][casilla]: XOR que aplica la jugada en las 8 variantes y pasa el turno
+ZOBRIST_MOVES = {p: tuple(_pack([ZOBRIST_PIECES[p][CELL_MAPS[s][b]] ^ ZOBRIST_SIDE
+                                 for s in range(8)])
+                          for b in range(9))
+                 for p in 'XO'}
+
+def zobrist_keys(x, o, current_player):
+    keys = ZOBRIST_SIDE_KEYS if current_player == 'O' else 0
+    for b in range(9):
+        if x >> b & 1:
+            keys ^= ZOBRIST_MOVES['X'][b] ^ ZOBRIST_SIDE_KEYS
+        elif o >> b & 1:
+            keys ^= ZOBRIST_MOVES['O'][b] ^ ZOBRIST_SIDE_KEYS
+    return keys
+
+def canonical_zobrist(keys):
+    # (hash mínimo entre las 8 variantes, simetría que lo produce)
+    return min((keys >> 64 * s & ZOBRIST_MASK, s) for s in range(8))
+
+def canonical(x, o):
+    # Devuelve (clave mínima entre las 8 simetrías, índice de la simetría usada)
+    return min((t[x] << 9 | t[o], s) for s, t in enumerate(TRANSFORMS))
+
+def board_masks(board):
+    x = o = 0
+    for b in range(9):
+        c = board[b // 3][b % 3]
+        if c == 'X':   x |= 1 << b
+        elif c == 'O': o |= 1 << b
+    return x, o
+
+def game_masks(game):
+    return game.masks() if hasattr(game, 'masks') else board_masks(game.board)
+
+class ZobristState:
+    """
+    Parte común de TicTacToe y BitboardTicTacToe: las claves de Zobrist se
+    derivan de `keys` (que cada clase actualiza en sus jugadas) y la
+    heurística se consulta en la caché de posiciones antes de calcularla
+    con `compute_heuristic`.
+    """
+    __slots__ = ()
+    # Caché de la heurística por tablero; None la desactiva
+    cache = POSITION_CACHE
+
+    @property
+    def key(self):
+        # Hash de Zobrist de 64 bits de la posición, incluido el jugador en turno
+        return self.keys & ZOBRIST_MASK
+
+    @property
+    def canonical_key(self):
+        # (hash igual para las 8 posiciones simétricas, simetría que lleva a la canónica)
+        return canonical_zobrist(self.keys)
+
+    def evaluate_heuristic(self):
+        if self.game_over:
+            return self.get_utility()
+        cache = self.cache
+        if cache is None:
+            return self.compute_heuristic()
+        key = self.keys & ZOBRIST_MASK
+        score = cache.get(key)
+        if score is None:
+            score = self.compute_heuristic()
+            cache.put(key, score)
+        return score
+
+class BitboardTicTacToe(ZobristState):
+    __slots__ = ('x', 'o', 'current_player', 'winner', 'game_over', 'history', 'keys')
+
+    def __init__(self, first_player='X'):
+        self.x = 0
+        self.o = 0
+        self.current_player = first_player
+        self.winner = None
+        self.game_over = False
+        self.history = []
+        # Hashes de Zobrist de las 8 simetrías empaquetados (ver ZOBRIST_MOVES)
+        self.keys = ZOBRIST_SIDE_KEYS if first_player == 'O' else 0
+
+    @classmethod
+    def from_masks(cls, x, o, current_player):
+        state = cls(current_player)
+        state.x, state.o = x, o
+        state.keys = zobrist_keys(x, o, current_player)
+        state.check_winner()
+        return state
+
+    @classmethod
+    def from_game(cls, game):
+        state = cls(game.current_player)
+        state.x, state.o = game_masks(game)
+        state.keys = zobrist_keys(state.x, state.o, state.current_player)
+        state.winner = game.winner
+        state.game_over = game.game_over
+        return state
+
+    def reset(self, first_player='X'):
+        self.x = self.o = 0
+        self.current_player = first_player
+        self.winner = None
+        self.game_over = False
+        self.history.clear()
+        self.keys = ZOBRIST_SIDE_KEYS if first_player == 'O' else 0
+
+    def masks(self):
+        return self.x, self.o
+
+    def available_moves(self):
+        return list(FREE_MOVES[self.x | self.o])
+
+    def make_move(self, pos):
+        bit = 1 << (pos[0] * 3 + pos[1])
+        if self.game_over or (self.x | self.o) & bit:
+            return False
+        self.keys ^= ZOBRIST_MOVES[self.current_player][pos[0] * 3 + pos[1]]
+        if self.current_player == 'X':
+            self.x |= bit
+            self.current_player = 'O'
+        else:
+            self.o |= bit
+            self.current_player = 'X'
+        self.check_winner()
+        return True
+
+    def push(self, pos):
+        undo = (pos, self.x, self.o, self.current_player, self.winner, self.game_over, self.keys)
+        if self.make_move(pos):
+            self.history.append(undo)
+            return True
+        return False
+
+    def pop(self):
+        (pos, self.x, self.o, self.current_player, self.winner, self.game_over,
+         self.keys) = self.history.pop()
+        return pos
+
+    def check_winner(self):
+        if WINNING[self.x]:
+            self.winner, self.game_over = 'X', True
+        elif WINNING[self.o]:
+            self.winner, self.game_over = 'O', True
+        elif self.x | self.o == FULL:
+            self.game_over = True
+
+    def get_utility(self):
+        if   self.winner == 'X': return  1
+        elif self.winner == 'O': return -1
+        elif self.game_over:     return  0
+        else:                    return None
+
+    def compute_heuristic(self):
+        score = 0
+        for line in LINES:
+            xs, os = POPCOUNT[self.x & line], POPCOUNT[self.o & line]
+            if xs and not os:
+                score += 0.1 * xs
+            elif os and not xs:
+                score -= 0.1 * os
+        if self.x & CENTER:
+            score += 0.2
+        elif self.o & CENTER:
+            score -= 0.2
+        return score
+
+    def print_board(self):
+        for i in range(3):
+            print('|'.join('X' if self.x >> (i * 3 + j) & 1 else
+                           'O' if self.o >> (i * 3 + j) & 1 else ' '
+                           for j in range(3)))
+            if i < 2:
+                print('-' * 5)
+
+    def clone(self):
+        copy = BitboardTicTacToe.__new__(BitboardTicTacToe)
+        copy.x, copy.o = self.x, self.o
+        copy.current_player = self.current_player
+        copy.winner = self.winner
+        copy.game_over = self.game_over
+        copy.history = []
+        copy.keys = self.keys
+        return copy
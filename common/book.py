@@ -0,0 +1,129 @@
+import argparse
+import struct
+
+from common.bitboard import MOVES, BitboardTicTacToe
+from common.transposition import canonical_position, from_canonical_cell, to_canonical_cell
+
+MAGIC = b'TTTB'
+RECORD = struct.Struct('<IB')
+
+class OpeningBook:
+    """
+    Libro de aperturas: clave canónica de la posición (reducida por
+    simetría, con el jugador en turno) -> casilla de la mejor jugada en
+    coordenadas canónicas. En disco ocupa 5 bytes por posición.
+    """
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, game):
+        key, sym = canonical_position(game)
+        cell = self.entries.get(key)
+        return None if cell is None else from_canonical_cell(cell, sym)
+
+    def add(self, game, move):
+        key, sym = canonical_position(game)
+        self.entries[key] = to_canonical_cell(move, sym)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(self.entries)))
+            for key, cell in sorted(self.entries.items()):
+                f.write(RECORD.pack(key, cell))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} no es un libro de aperturas válido")
+        count, = struct.unpack_from('<I', data, len(MAGIC))
+        offset = len(MAGIC) + 4
+        entries = dict(RECORD.iter_unpack(data[offset:offset + count * RECORD.size]))
+        return cls(entries)
+
+def build_book(player, max_ply=4, first_players=('X', 'O')):
+    """
+    Recorre todas las posiciones con menos de `max_ply` fichas a partir del
+    tablero vacío y guarda la jugada que elige `player` en cada una. Las
+    posiciones simétricas se buscan una sola vez.
+    """
+    book = OpeningBook()
+
+    def visit(game, ply):
+        if game.game_over or ply >= max_ply:
+            return
+        key, _ = canonical_position(game)
+        if key in book.entries:
+            return
+        move, _ = player.get_move(game)
+        book.add(game, move)
+        for move in game.available_moves():
+            game.push(move)
+            visit(game, ply + 1)
+            game.pop()
+
+    for first_player in first_players:
+        visit(BitboardTicTacToe(first_player), 0)
+    return book
+
+def check_book(book, table=None):
+    """
+    Compara cada jugada del libro con las óptimas de la tabla del solver.
+    Devuelve {jugador en turno: (subóptimas, total)}.
+    """
+    if table is None:
+        from common.solver import load_or_build
+        table = load_or_build()
+    counts = {'X': [0, 0], 'O': [0, 0]}
+    for key, cell in book.entries.items():
+        # La clave es el tablero canónico, así que la casilla se aplica sin transformar
+        player = 'O' if key & 1 else 'X'
+        board = key >> 1
+        game = BitboardTicTacToe.from_masks(board >> 9, board & 0b111111111, player)
+        counts[player][1] += 1
+        if MOVES[cell] not in table.best_moves(game):
+            counts[player][0] += 1
+    return {player: tuple(count) for player, count in counts.items()}
+
+class BookPlayer:
+    # Consulta el libro y, si la posición no está, delega en el jugador de búsqueda
+    def __init__(self, book, fallback):
+        self.book = book
+        self.fallback = fallback
+        self.nodes_explored = 0
+        self.book_hits = 0
+
+    def get_move(self, game):
+        move = self.book.lookup(game)
+        if move is not None:
+            self.book_hits += 1
+            self.nodes_explored = 0
+            return move, self.nodes_explored
+        move, self.nodes_explored = self.fallback.get_move(game)
+        return move, self.nodes_explored
+
+def main(argv=None):
+    from common.benchmark import player_factory
+
+    parser = argparse.ArgumentParser(description="Genera un libro de aperturas a partir de la búsqueda")
+    parser.add_argument('output')
+    parser.add_argument('--player', default='alphabeta', help="alphabeta, pvs, minimax o mcts")
+    parser.add_argument('--param', type=int, default=9, help="profundidad o simulaciones")
+    parser.add_argument('--ply', type=int, default=4)
+    parser.add_argument('--check', action='store_true', help="compara el libro con el solver")
+    args = parser.parse_args(argv)
+
+    book = build_book(player_factory(args.player, args.param)(), args.ply)
+    book.save(args.output)
+    print(f"{len(book)} posiciones guardadas en {args.output}")
+    if args.check:
+        for player, (bad, total) in check_book(book).items():
+            print(f"  {player} en turno: {bad}/{total} jugadas subóptimas según el solver")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Caché acotada con expulsión LRU y contadores de aciertos/fallos. Las
+    claves son el hash de Zobrist de la posición (`game.key`); en 3x3 solo
+    hay unos pocos miles de entradas distintas.
+    """
+    def __init__(self, capacity=8192):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        # Vacía la caché y reinicia los contadores, p. ej. entre mediciones del benchmark
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Caché compartida por TicTacToe, BitboardTicTacToe y los jugadores
+POSITION_CACHE = LRUCache()
@@ -0,0 +1,95 @@
+from common.bitboard import POPCOUNT, WINNING, BitboardTicTacToe
+
+# Construcción de jugadores a partir de nombres de la línea de comandos, compartida por
+# python -m common y common.server. Solo se importa NumPy si el jugador lo necesita
+
+PLAYER_NAMES = ('solver', 'alphabeta', 'pvs', 'minimax', 'mcts')
+
+EMPTY = '.-_ '
+
+def parse_board(text, to_move=None):
+    """
+    Tablero como 9 caracteres por filas ('X', 'O' y '.', '-' o '_' para
+    vacío; se ignoran '/' y ','). Si no se indica quién mueve, juega quien
+    tenga menos fichas, y X si tienen las mismas. Lanza ValueError si la
+    posición no puede darse en una partida.
+    """
+    cells = [c for c in text.upper() if c not in '/,']
+    if len(cells) != 9 or any(c not in 'XO' + EMPTY for c in cells):
+        raise ValueError(f"tablero inválido: {text!r}")
+    x = sum(1 << b for b, c in enumerate(cells) if c == 'X')
+    o = sum(1 << b for b, c in enumerate(cells) if c == 'O')
+    xs, os = POPCOUNT[x], POPCOUNT[o]
+    if abs(xs - os) > 1:
+        raise ValueError(f"tablero imposible: {xs} fichas de X y {os} de O")
+    if WINNING[x] and WINNING[o]:
+        raise ValueError("tablero imposible: X y O tienen línea a la vez")
+    if to_move is None:
+        to_move = 'O' if xs > os else 'X'
+    elif to_move not in ('X', 'O'):
+        raise ValueError(f"jugador en turno inválido: {to_move!r}")
+    elif xs != os and to_move == ('X' if xs > os else 'O'):
+        # Con las mismas fichas puede mover cualquiera; si no, mueve quien tiene menos
+        raise ValueError(f"no puede mover {to_move} con {xs} fichas de X y {os} de O")
+    return BitboardTicTacToe.from_masks(x, o, to_move)
+
+def make_player(name, param=None, book=None, rollouts=None):
+    if name == 'solver':
+        from common.solver import SolvedPlayer
+        player = SolvedPlayer()
+    else:
+        from common.players import AlphaBetaPlayer, MCTSPlayer, MinimaxPlayer, PVSPlayer
+        if name == 'mcts':
+            player = MCTSPlayer(param or 50, backend='bitboard', rollouts_per_leaf=rollouts)
+        else:
+            cls = {'alphabeta': AlphaBetaPlayer, 'pvs': PVSPlayer, 'minimax': MinimaxPlayer}[name]
+            player = cls(9 if param is None else param, backend='bitboard')
+    if book is not None:
+        from common.book import BookPlayer, OpeningBook
+        player = BookPlayer(OpeningBook.load(book), player)
+    return player
+
+# Jugadores de cada proceso del pool de common.server, reutilizados entre peticiones
+_players = {}
+
+def cached_player(name, param=None, rollouts=None):
+    key = (name, param, rollouts)
+    player = _players.get(key)
+    if player is None:
+        player = _players[key] = make_player(name, param, rollouts=rollouts)
+    return player
+
+def search_batch(jobs):
+    """
+    Resuelve un lote de peticiones (x, o, jugador en turno, nombre, param,
+    rollouts) en un proceso del pool. Las de MCTS con rollouts vectorizados
+    y la misma configuración se buscan juntas con MCTSPlayer.get_moves;
+    el resto, una a una. Devuelve (jugada, nodos) en el orden de `jobs`, o
+    la excepción de la búsqueda en el lugar de cada petición que falló.
+    """
+    results = [None] * len(jobs)
+    groups = {}
+
+    def search(i, name, param, rollouts, game):
+        try:
+            results[i] = cached_player(name, param, rollouts).get_move(game)
+        except Exception as e:
+            results[i] = e
+
+    for i, (x, o, to_move, name, param, rollouts) in enumerate(jobs):
+        game = BitboardTicTacToe.from_masks(x, o, to_move)
+        if name == 'mcts' and rollouts:
+            groups.setdefault((param, rollouts), []).append((i, game))
+        else:
+            search(i, name, param, rollouts, game)
+    for (param, rollouts), items in groups.items():
+        try:
+            moves = cached_player('mcts', param, rollouts).get_moves([game for _, game in items])
+        except Exception:
+            # Si falla el grupo, cada petición se repite sola para aislar la que da el error
+            for i, game in items:
+                search(i, 'mcts', param, rollouts, game)
+            continue
+        for (i, _), result in zip(items, moves):
+            results[i] = result
+    return results
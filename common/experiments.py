@@ -0,0 +1,118 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from common.game import TicTacToe
+
+CHUNK_SIZE = 100
+
+def trial_seed(seed, trial):
+    # Semilla propia de cada partida: el resultado no depende del reparto entre procesos
+    return seed << 32 | trial
+
+def play_trials(player_factory, game_factory, first_player, trials, seed, counters=(),
+                record_moves=False):
+    """
+    Juega las partidas `trials` (índices) con el jugador creado por
+    `player_factory` como X contra un oponente aleatorio como O. Con
+    `record_moves` guarda además la latencia de cada jugada en nanosegundos.
+    """
+    player = player_factory()
+    totals = {'wins': 0, 'losses': 0, 'draws': 0, 'nodes': 0, 'time_ns': 0, 'moves': 0}
+    totals.update((name, 0) for name in counters)
+    if record_moves:
+        totals['move_times_ns'] = []
+    for trial in trials:
+        random.seed(trial_seed(seed, trial))
+        game = game_factory(first_player)
+        while not game.game_over:
+            if game.current_player == 'X':
+                start = time.perf_counter_ns()
+                move, nodes = player.get_move(game)
+                elapsed = time.perf_counter_ns() - start
+                totals['time_ns'] += elapsed
+                if record_moves:
+                    totals['move_times_ns'].append(elapsed)
+                totals['nodes'] += nodes
+                totals['moves'] += 1
+                for name in counters:
+                    totals[name] += getattr(player, name)
+                game.make_move(move)
+            else:
+                game.make_move(random.choice(game.available_moves()))
+        if game.winner == 'X':
+            totals['wins'] += 1
+        elif game.winner == 'O':
+            totals['losses'] += 1
+        else:
+            totals['draws'] += 1
+    return totals
+
+def merge_totals(parts):
+    merged = {}
+    for part in parts:
+        for name, value in part.items():
+            merged[name] = merged[name] + value if name in merged else value
+    return merged
+
+def run_experiments(player_factory, game_factory=TicTacToe, first_player='X', num_trials=1000,
+                    workers=1, seed=None, counters=(), verbose=True, record_moves=False,
+                    stateful=False):
+    """
+    Ejecuta `num_trials` partidas repartidas en bloques de CHUNK_SIZE entre
+    `workers` procesos (None = todos los núcleos). Cada partida usa la semilla
+    trial_seed(seed, índice), así que con la misma semilla los resultados no
+    dependen del número de procesos. `player_factory` y `game_factory` deben
+    poder serializarse con pickle cuando workers != 1, y cada bloque recibe
+    su propia copia: el estado que lleve la fábrica (tabla de transposición,
+    ordenación con historia, árbol compartido de MCTS) no se comparte entre
+    bloques ni vuelve al proceso principal. Por eso con `stateful=True` solo
+    se admite workers=1.
+    """
+    if seed is None:
+        seed = random.getrandbits(31)
+    workers = workers or os.cpu_count()
+    if stateful and workers != 1:
+        raise ValueError("un jugador con estado compartido entre partidas requiere workers=1")
+    chunks = [range(i, min(i + CHUNK_SIZE, num_trials)) for i in range(0, num_trials, CHUNK_SIZE)]
+    experiment_start_time = time.perf_counter()
+
+    parts = []
+    done = 0
+    if workers == 1:
+        for chunk in chunks:
+            parts.append(play_trials(player_factory, game_factory, first_player, chunk, seed,
+                                     counters, record_moves))
+            done += len(chunk)
+            if verbose:
+                print(f"  Progreso: {done}/{num_trials} pruebas completadas")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(play_trials, player_factory, game_factory, first_player,
+                                   chunk, seed, counters, record_moves): len(chunk)
+                       for chunk in chunks}
+            for future in as_completed(futures):
+                parts.append(future.result())
+                done += futures[future]
+                if verbose:
+                    print(f"  Progreso: {done}/{num_trials} pruebas completadas")
+
+    totals = merge_totals(parts)
+    results = {
+        'wins': totals['wins'],
+        'losses': totals['losses'],
+        'draws': totals['draws'],
+        'avg_nodes': totals['nodes'] / num_trials,
+        'avg_time': totals['time_ns'] / 1e9 / num_trials,
+        'total_nodes': totals['nodes'],
+        'total_moves': totals['moves'],
+        'total_search_time': totals['time_ns'] / 1e9,
+        'total_experiment_time': time.perf_counter() - experiment_start_time,
+        'seed': seed,
+    }
+    for name in counters:
+        results[f'avg_{name}'] = totals[name] / num_trials
+    if record_moves:
+        results['move_times_ns'] = totals['move_times_ns']
+    return results
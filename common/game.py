@@ -1,39 +1,121 @@
+import random
+from functools import lru_cache
+
 import numpy as np
 
-class TicTacToe:
+from common.bitboard import LINES, ZOBRIST_MOVES, ZOBRIST_SIDE_KEYS, ZobristState, zobrist_keys
+
+# Índices de las líneas (de LINES) que pasan por cada casilla
+CELL_LINES = tuple(tuple(l for l, line in enumerate(LINES) if line >> b & 1) for b in range(9))
+
+class TicTacToe(ZobristState):
     def __init__(self, first_player='X'):
         self.board = np.array([[' '] * 3 for _ in range(3)])
         self.current_player = first_player
         self.winner = None
         self.game_over = False
+        self.history = []
+        # Fichas de cada jugador en cada una de las 8 líneas, actualizadas en make_move/pop
+        self.x_counts = [0] * 8
+        self.o_counts = [0] * 8
+        self.filled = 0
+        # Codificación compacta del tablero: bit b para X, bit 9+b para O
+        self.code = 0
+        # Hashes de Zobrist de las 8 simetrías empaquetados (ver common.bitboard.ZOBRIST_MOVES)
+        self.keys = ZOBRIST_SIDE_KEYS if first_player == 'O' else 0
+
+    @classmethod
+    def from_game(cls, game):
+        state = cls(game.current_player)
+        x, o = game.masks()
+        for b in range(9):
+            if   x >> b & 1: state.board[b // 3, b % 3] = 'X'
+            elif o >> b & 1: state.board[b // 3, b % 3] = 'O'
+        state.recount()
+        state.winner = game.winner
+        state.game_over = game.game_over
+        return state
 
     def reset(self, first_player='X'):
         self.board[:] = ' '
         self.current_player = first_player
         self.winner = None
         self.game_over = False
+        self.history.clear()
+        self.recount()
+
+    def recount(self):
+        self.x_counts = [0] * 8
+        self.o_counts = [0] * 8
+        self.filled = 0
+        self.code = 0
+        for b in range(9):
+            c = self.board[b // 3, b % 3]
+            if c != ' ':
+                counts = self.x_counts if c == 'X' else self.o_counts
+                for line in CELL_LINES[b]:
+                    counts[line] += 1
+                self.filled += 1
+                self.code |= 1 << (b if c == 'X' else b + 9)
+        self.keys = zobrist_keys(self.code & 0b111111111, self.code >> 9, self.current_player)
 
     def available_moves(self):
         return [(i, j) for i in range(3) for j in range(3) if self.board[i,j] == ' ']
 
+    def masks(self):
+        return self.code & 0b111111111, self.code >> 9
+
     def make_move(self, pos):
         if not self.game_over and self.board[pos] == ' ':
             self.board[pos] = self.current_player
+            b = pos[0] * 3 + pos[1]
+            self.keys ^= ZOBRIST_MOVES[self.current_player][b]
+            if self.current_player == 'X':
+                counts = self.x_counts
+                self.code |= 1 << b
+            else:
+                counts = self.o_counts
+                self.code |= 1 << (b + 9)
+            for line in CELL_LINES[b]:
+                counts[line] += 1
+            self.filled += 1
             self.check_winner()
             self.current_player = 'O' if self.current_player == 'X' else 'X'
             return True
         return False
 
+    def push(self, pos):
+        undo = (pos, self.current_player, self.winner, self.game_over)
+        if self.make_move(pos):
+            self.history.append(undo)
+            return True
+        return False
+
+    def pop(self):
+        pos, self.current_player, self.winner, self.game_over = self.history.pop()
+        self.board[pos] = ' '
+        b = pos[0] * 3 + pos[1]
+        self.keys ^= ZOBRIST_MOVES[self.current_player][b]
+        if self.current_player == 'X':
+            counts = self.x_counts
+            self.code &= ~(1 << b)
+        else:
+            counts = self.o_counts
+            self.code &= ~(1 << (b + 9))
+        for line in CELL_LINES[b]:
+            counts[line] -= 1
+        self.filled -= 1
+        return pos
+
     def check_winner(self):
-        B = self.board
-        lines = [B[i,:] for i in range(3)] + [B[:,j] for j in range(3)] \
-                + [[B[i,i] for i in range(3)], [B[i,2-i] for i in range(3)]]
-        for line in lines:
-            if line[0] != ' ' and all(line[0] == c for c in line):
-                self.winner = line[0]
-                self.game_over = True
-                return
-        if not self.available_moves():
+        # Una línea con 3 fichas del mismo jugador es victoria
+        if 3 in self.x_counts:
+            self.winner = 'X'
+            self.game_over = True
+        elif 3 in self.o_counts:
+            self.winner = 'O'
+            self.game_over = True
+        elif self.filled == 9:
             self.game_over = True
 
     def get_utility(self):
@@ -42,11 +124,182 @@ class TicTacToe:
         elif self.game_over:     return  0
         else:                    return None
 
+    def compute_heuristic(self):
+        # Positivo favorece a X: 0.1 por ficha en cada línea abierta solo para un jugador,
+        # más 0.2 por ocupar el centro
+        score = 0
+        for xs, os in zip(self.x_counts, self.o_counts):
+            if xs and not os:
+                score += 0.1 * xs
+            elif os and not xs:
+                score -= 0.1 * os
+        if self.board[1, 1] == 'X':
+            score += 0.2
+        elif self.board[1, 1] == 'O':
+            score -= 0.2
+        return score
+
+    def print_board(self):
+        for i in range(3):
+            print('|'.join(self.board[i]))
+            if i < 2:
+                print('-' * 5)
+
     def clone(self):
         copy = TicTacToe(self.current_player)
         copy.board = np.copy(self.board)
         copy.winner = self.winner
         copy.game_over = self.game_over
+        copy.x_counts = self.x_counts[:]
+        copy.o_counts = self.o_counts[:]
+        copy.filled = self.filled
+        copy.code = self.code
+        copy.keys = self.keys
+        return copy
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+@lru_cache(maxsize=None)
+def cell_windows(rows, cols, k):
+    # Para cada casilla, los índices de las ventanas de k casillas en línea que la contienen
+    windows = []
+    for r in range(rows):
+        for c in range(cols):
+            for dr, dc in DIRECTIONS:
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < rows and 0 <= end_c < cols:
+                    windows.append([(r + dr * i) * cols + c + dc * i for i in range(k)])
+    by_cell = [[] for _ in range(rows * cols)]
+    for w, cells in enumerate(windows):
+        for b in cells:
+            by_cell[b].append(w)
+    return len(windows), tuple(tuple(ws) for ws in by_cell)
+
+@lru_cache(maxsize=None)
+def zobrist_table(num_cells):
+    # Número aleatorio de 64 bits por (jugador, casilla) y para el cambio de turno
+    rng = random.Random(num_cells)
+    pieces = {p: tuple(rng.getrandbits(64) for _ in range(num_cells)) for p in 'XO'}
+    side = rng.getrandbits(64)
+    return {p: tuple(h ^ side for h in pieces[p]) for p in 'XO'}, side
+
+class MNKGame:
+    """
+    Juego m,n,k: tablero de rows x cols donde gana quien alinee k fichas.
+    Mantiene por cada ventana de k casillas el número de fichas de cada
+    jugador, así que make_move solo toca las ventanas que pasan por la
+    última ficha y la heurística se actualiza de forma incremental.
+    """
+    def __init__(self, rows=3, cols=3, k=3, first_player='X'):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        num_windows, self.cell_windows = cell_windows(rows, cols, k)
+        self.cells = [' '] * (rows * cols)
+        self.x_counts = [0] * num_windows
+        self.o_counts = [0] * num_windows
+        self.score = 0.0
+        self.filled = 0
+        self.current_player = first_player
+        self.winner = None
+        self.game_over = False
+        self.history = []
+        # Hash de Zobrist de 64 bits (sin simetrías: el tablero puede no ser cuadrado)
+        self.zobrist_moves, side = zobrist_table(rows * cols)
+        self.key = side if first_player == 'O' else 0
+
+    def reset(self, first_player='X'):
+        self.__init__(self.rows, self.cols, self.k, first_player)
+
+    def available_moves(self):
+        cols = self.cols
+        return [(b // cols, b % cols) for b, c in enumerate(self.cells) if c == ' ']
+
+    def masks(self):
+        x = o = 0
+        for b, c in enumerate(self.cells):
+            if   c == 'X': x |= 1 << b
+            elif c == 'O': o |= 1 << b
+        return x, o
+
+    def make_move(self, pos):
+        b = pos[0] * self.cols + pos[1]
+        if self.game_over or self.cells[b] != ' ':
+            return False
+        player = self.current_player
+        self.cells[b] = player
+        self.key ^= self.zobrist_moves[player][b]
+        if player == 'X':
+            mine, theirs, sign = self.x_counts, self.o_counts, 1
+        else:
+            mine, theirs, sign = self.o_counts, self.x_counts, -1
+        for w in self.cell_windows[b]:
+            # Cada ventana aporta 0.1 por ficha mientras solo tenga fichas de un jugador
+            if not theirs[w]:
+                self.score += sign * 0.1
+            elif not mine[w]:
+                self.score += sign * 0.1 * theirs[w]
+            mine[w] += 1
+            if mine[w] == self.k:
+                self.winner = player
+                self.game_over = True
+        self.filled += 1
+        if self.filled == len(self.cells):
+            self.game_over = True
+        self.current_player = 'O' if player == 'X' else 'X'
+        return True
+
+    def push(self, pos):
+        undo = (pos, self.current_player, self.winner, self.game_over, self.score)
+        if self.make_move(pos):
+            self.history.append(undo)
+            return True
+        return False
+
+    def pop(self):
+        pos, self.current_player, self.winner, self.game_over, self.score = self.history.pop()
+        b = pos[0] * self.cols + pos[1]
+        self.cells[b] = ' '
+        self.key ^= self.zobrist_moves[self.current_player][b]
+        counts = self.x_counts if self.current_player == 'X' else self.o_counts
+        for w in self.cell_windows[b]:
+            counts[w] -= 1
+        self.filled -= 1
+        return pos
+
+    def get_utility(self):
+        if   self.winner == 'X': return  1
+        elif self.winner == 'O': return -1
+        elif self.game_over:     return  0
+        else:                    return None
+
+    def evaluate_heuristic(self):
+        if self.game_over:
+            return self.get_utility()
+        # Se comprime a (-1, 1) para no superar nunca el valor de una victoria
+        return self.score / (1 + abs(self.score))
+
+    def print_board(self):
+        for r in range(self.rows):
+            print('|'.join(self.cells[r * self.cols:(r + 1) * self.cols]))
+            if r < self.rows - 1:
+                print('-' * (2 * self.cols - 1))
+
+    def clone(self):
+        copy = MNKGame.__new__(MNKGame)
+        copy.rows, copy.cols, copy.k = self.rows, self.cols, self.k
+        copy.cell_windows = self.cell_windows
+        copy.cells = self.cells[:]
+        copy.x_counts = self.x_counts[:]
+        copy.o_counts = self.o_counts[:]
+        copy.score = self.score
+        copy.filled = self.filled
+        copy.current_player = self.current_player
+        copy.winner = self.winner
+        copy.game_over = self.game_over
+        copy.history = []
+        copy.zobrist_moves = self.zobrist_moves
+        copy.key = self.key
         return copy
 
 def display_results(results, label):
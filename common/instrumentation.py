@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+from collections import Counter
+
+# Métodos del estado que se cronometran, agrupados por categoría
+TIMED_METHODS = {
+    'clone': ('clone',),
+    'move': ('push', 'pop', 'make_move', 'available_moves'),
+    'eval': ('evaluate_heuristic', 'get_utility'),
+    'winner': ('check_winner',),
+}
+
+def _unpickle_state(state):
+    return state
+
+def effective_branching_factor(nodes, depth):
+    # b* tal que b + b² + ... + b^depth = nodes, por bisección
+    if depth <= 0 or nodes <= 0:
+        return 0.0
+    low, high = 0.0, float(max(nodes, 1))
+    for _ in range(60):
+        b = (low + high) / 2
+        total = sum(b ** d for d in range(1, depth + 1))
+        if total < nodes:
+            low = b
+        else:
+            high = b
+    return (low + high) / 2
+
+class SearchStats:
+    """
+    Instrumentación opcional de los jugadores (parámetro `stats`). Cuando
+    está activa, el jugador envuelve su copia del estado en una subclase
+    que cronometra clone / jugadas / evaluación / comprobación de ganador
+    (tiempo exclusivo: lo que gasta check_winner no cuenta en make_move) y
+    cuenta los nodos por profundidad en cada push (las jugadas de las
+    simulaciones de MCTS van aparte, en `playout_nodes`, y no cuentan para
+    max_depth ni ebf). Los cortes se anotan
+    por profundidad y, en MCTS, se guardan histogramas de profundidad y
+    anchura del árbol. Cada llamada a get_move deja un registro en
+    `records`. Si el jugador no recibe `stats`, no se ejecuta nada de esto.
+    """
+    def __init__(self):
+        self.records = []
+        self.current = None
+        self._local = threading.local()
+        self._classes = {}
+
+    def begin_move(self, player):
+        self.current = {
+            'player': type(player).__name__,
+            'depth_nodes': Counter(),
+            'playout_nodes': Counter(),
+            'cutoffs': Counter(),
+            'time_ns': dict.fromkeys(TIMED_METHODS, 0),
+        }
+        self._start = time.perf_counter_ns()
+
+    def end_move(self, nodes):
+        record = self.current
+        record['total_ns'] = time.perf_counter_ns() - self._start
+        record['nodes'] = nodes
+        depth_nodes = record['depth_nodes']
+        max_depth = max(depth_nodes, default=0)
+        record['max_depth'] = max_depth
+        record['ebf'] = effective_branching_factor(sum(depth_nodes.values()), max_depth)
+        record['depth_nodes'] = dict(sorted(depth_nodes.items()))
+        record['playout_nodes'] = dict(sorted(record['playout_nodes'].items()))
+        record['cutoffs'] = dict(sorted(record['cutoffs'].items()))
+        if 'expansions' in record:
+            # En MCTS nodes_explored suma pasos de selección y expansiones
+            record['selections'] = nodes - record['expansions']
+        self.records.append(record)
+        self.current = None
+        return record
+
+    def cutoff(self, depth):
+        self.current['cutoffs'][depth] += 1
+
+    def playout(self, active):
+        # Marca (por hilo) las jugadas de la simulación de MCTS, que no son nodos de la búsqueda
+        self._local.playout = active
+
+    def instrument(self, state):
+        # Cambia la clase de la copia privada del jugador por la subclase cronometrada
+        cls = type(state)
+        timed = self._classes.get(cls)
+        if timed is None:
+            timed = self._classes[cls] = self._timed_class(cls)
+        state.__class__ = timed
+        return state
+
+    def _timed_class(self, cls):
+        stats = self
+        local = self._local
+        namespace = {'__slots__': ()}
+
+        def wrap(category, method):
+            def timed(self, *args):
+                inner = getattr(local, 'inner', 0)
+                local.inner = 0
+                start = time.perf_counter_ns()
+                result = method(self, *args)
+                elapsed = time.perf_counter_ns() - start
+                stats.current['time_ns'][category] += elapsed - local.inner
+                local.inner = inner + elapsed
+                if method.__name__ == 'push':
+                    counts = 'playout_nodes' if getattr(local, 'playout', False) else 'depth_nodes'
+                    stats.current[counts][len(self.history)] += 1
+                elif method.__name__ == 'clone':
+                    result.__class__ = type(self)
+                return result
+            return timed
+
+        def reduce(self, protocol):
+            # La clase cronometrada no se puede serializar: a otros procesos (p. ej. MCTS con
+            # parallel='root') se envía una copia de la clase original
+            return _unpickle_state, (cls.clone(self),)
+
+        for category, names in TIMED_METHODS.items():
+            for name in names:
+                method = getattr(cls, name, None)
+                if method is not None:
+                    namespace[name] = wrap(category, method)
+        namespace['__reduce_ex__'] = reduce
+        return type('Timed' + cls.__name__, (cls,), namespace)
+
+    def record_tree(self, root, before=0):
+        # Histogramas del árbol de objetos MCTSNode tras la búsqueda
+        depths, widths = Counter(), Counter()
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            depths[depth] += 1
+            if node.children:
+                widths[len(node.children)] += 1
+                stack.extend((child, depth + 1) for child in node.children)
+        self._store_tree(depths, widths, sum(depths.values()) - before)
+
+    def record_array_tree(self, tree, root):
+        depth = [0] * tree.size
+        depths, widths = Counter(), Counter()
+        for node in range(tree.size):
+            parent = int(tree.parent[node])
+            if node != root and parent >= 0:
+                depth[node] = depth[parent] + 1
+            # Los hijos reservados pero nunca visitados no cuentan como nodos del árbol
+            if node == root or tree.visits[node]:
+                depths[depth[node]] += 1
+                if tree.visited_children[node]:
+                    widths[int(tree.visited_children[node])] += 1
+        self._store_tree(depths, widths, sum(depths.values()) - 1)
+
+    @staticmethod
+    def tree_size(root):
+        size, stack = 0, [root]
+        while stack:
+            node = stack.pop()
+            size += 1
+            stack.extend(node.children)
+        return size
+
+    def _store_tree(self, depths, widths, expansions):
+        self.current['tree_depth'] = dict(sorted(depths.items()))
+        self.current['tree_width'] = dict(sorted(widths.items()))
+        self.current['expansions'] = expansions
+
+    def write_jsonl(self, path):
+        # Un registro JSON por jugada
+        with open(path, 'w') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + '\n')
+
+    def clear(self):
+        self.records.clear()
@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+# Prioridad estática por casilla: centro > esquinas > bordes
+PRIORS = {(1, 1): 2,
+          (0, 0): 1, (0, 2): 1, (2, 0): 1, (2, 2): 1,
+          (0, 1): 0, (1, 0): 0, (1, 2): 0, (2, 1): 0}
+
+class MoveOrdering:
+    """
+    Estrategia de ordenación de jugadas para AlphaBetaPlayer. `score` da la
+    prioridad de una jugada (mayor = antes) y `record_cutoff` recibe la
+    jugada que produjo una poda, con la profundidad restante del nodo.
+    """
+    def score(self, game, move, ply):
+        return 0
+
+    def record_cutoff(self, game, move, ply, remaining):
+        pass
+
+    def order(self, game, moves, ply):
+        return sorted(moves, key=lambda move: self.score(game, move, ply), reverse=True)
+
+class StaticOrdering(MoveOrdering):
+    def score(self, game, move, ply):
+        return PRIORS.get(move, 0)
+
+class KillerMoves(MoveOrdering):
+    # Jugadas que produjeron poda en otra rama de la misma profundidad
+    def __init__(self, slots=2):
+        self.slots = slots
+        self.killers = defaultdict(list)
+
+    def score(self, game, move, ply):
+        killers = self.killers.get(ply)
+        if killers and move in killers:
+            return self.slots - killers.index(move)
+        return 0
+
+    def record_cutoff(self, game, move, ply, remaining):
+        killers = self.killers[ply]
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.slots:]
+
+    def clear(self):
+        self.killers.clear()
+
+class HistoryHeuristic(MoveOrdering):
+    # Acumula remaining² por (jugador, jugada) en cada poda; persiste entre llamadas a get_move
+    def __init__(self):
+        self.table = defaultdict(int)
+
+    def score(self, game, move, ply):
+        return self.table[game.current_player, move]
+
+    def record_cutoff(self, game, move, ply, remaining):
+        self.table[game.current_player, move] += remaining * remaining
+
+    def clear(self):
+        self.table.clear()
+
+class CombinedOrdering(MoveOrdering):
+    # Las estrategias se aplican por prioridad: la primera decide y las demás desempatan
+    def __init__(self, *strategies):
+        self.strategies = strategies
+
+    def score(self, game, move, ply):
+        return tuple(strategy.score(game, move, ply) for strategy in self.strategies)
+
+    def record_cutoff(self, game, move, ply, remaining):
+        for strategy in self.strategies:
+            strategy.record_cutoff(game, move, ply, remaining)
+
+def default_ordering():
+    return CombinedOrdering(KillerMoves(), StaticOrdering(), HistoryHeuristic())
@@ -1,21 +1,68 @@
-from common.game import TicTacToe
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+from common.bitboard import BitboardTicTacToe
+from common.policy import RolloutPolicy
+from common.transposition import EXACT, LOWER, UPPER, from_canonical_cell, to_canonical_cell
+
+# NumPy (common.game, common.rollout, common.tree) se importa solo en las rutas que lo usan,
+# así el backend de bitboards arranca únicamente con la biblioteca estándar
+if TYPE_CHECKING:
+    from common.game import TicTacToe
+
+def backend_class(backend):
+    if backend == 'numpy':
+        from common.game import TicTacToe
+        return TicTacToe
+    if backend == 'bitboard':
+        return BitboardTicTacToe
+    return backend
+
+def as_backend(game, backend):
+    if backend is None:
+        return game.clone()
+    cls = backend_class(backend)
+    return game.clone() if isinstance(game, cls) else cls.from_game(game)
+
+def begin_stats(player, game):
+    # Sin instrumentación (stats=None) el estado se devuelve tal cual
+    if player.stats is None:
+        return game
+    player.stats.begin_move(player)
+    return player.stats.instrument(game)
 
 class MinimaxPlayer:
-    def __init__(self, max_depth=3):
+    def __init__(self, max_depth=3, backend=None, stats=None):
         self.max_depth = max_depth
+        self.backend = backend
+        # common.instrumentation.SearchStats opcional
+        self.stats = stats
         self.nodes_explored = 0
 
     def get_move(self, game: TicTacToe):
         self.nodes_explored = 0
+        game = begin_stats(self, as_backend(game, self.backend))
+        # Los valores son de X: si juega O, la raíz minimiza (se maximiza la utilidad negada)
+        maximizing = game.current_player == 'X'
+        sign = 1 if maximizing else -1
         best_score = float('-inf')
         best_move = None
         for move in game.available_moves():
-            new_game = game.clone()
-            new_game.make_move(move)
-            score = self.minimax(new_game, 0, False)
+            game.push(move)
+            score = sign * self.minimax(game, 0, not maximizing)
+            game.pop()
             if score > best_score:
                 best_score = score
                 best_move = move
+        if self.stats is not None:
+            self.stats.end_move(self.nodes_explored)
         return best_move, self.nodes_explored
 
     def minimax(self, game: TicTacToe, depth: int, is_maximizing: bool):
@@ -27,66 +74,732 @@ class MinimaxPlayer:
         if is_maximizing:
             best_score = float('-inf')
             for move in game.available_moves():
-                next_game = game.clone()
-                next_game.make_move(move)
-                score = self.minimax(next_game, depth + 1, False)
+                game.push(move)
+                score = self.minimax(game, depth + 1, False)
+                game.pop()
                 best_score = max(best_score, score)
             return best_score
         else:
             best_score = float('inf')
             for move in game.available_moves():
-                next_game = game.clone()
-                next_game.make_move(move)
-                score = self.minimax(next_game, depth + 1, True)
+                game.push(move)
+                score = self.minimax(game, depth + 1, True)
+                game.pop()
                 best_score = min(best_score, score)
             return best_score
 
+class SearchTimeout(Exception):
+    pass
+
 class AlphaBetaPlayer:
-    def __init__(self, max_depth=3):
+    def __init__(self, max_depth=3, backend=None, transposition_table=None, time_budget_ms=None,
+                 ordering=None, stats=None):
         self.max_depth = max_depth
+        self.backend = backend
+        self.stats = stats
+        self.tt = transposition_table
+        # Estrategia de common.ordering; None conserva el orden por filas
+        self.ordering = ordering
+        # Con time_budget_ms se ignora max_depth: profundización iterativa hasta agotar el tiempo
+        self.time_budget_ms = time_budget_ms
+        self.search_depth = max_depth
+        self.completed_depth = None
+        self.deadline = None
+        self.pv_moves = None
         self.nodes_explored = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
 
     def get_move(self, game: TicTacToe):
         self.nodes_explored = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        game = begin_stats(self, as_backend(game, self.backend))
+        if self.time_budget_ms is not None:
+            best_move = self.iterative_deepening(game)
+        else:
+            self.search_depth = self.max_depth
+            moves = game.available_moves()
+            if self.ordering is not None:
+                moves = self.ordering.order(game, moves, -1)
+            best_move, _ = self.search_root(game, moves)
+        if self.stats is not None:
+            self.stats.end_move(self.nodes_explored)
+        return best_move, self.nodes_explored
+
+    def iterative_deepening(self, game):
+        self.deadline = time.perf_counter() + self.time_budget_ms / 1000
+        self.pv_moves = {}
+        self.completed_depth = None
+        moves = game.available_moves()
+        if self.ordering is not None:
+            moves = self.ordering.order(game, moves, -1)
+        best_move = moves[0]
+        try:
+            # Con depth = casillas libres - 1 la búsqueda llega al final de la partida
+            for depth in range(len(moves)):
+                self.search_depth = depth
+                best_move, scores = self.search_root(game, moves)
+                self.completed_depth = depth
+                # La siguiente iteración empieza por la mejor jugada de esta
+                moves = sorted(moves, key=scores.get, reverse=True)
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+            self.pv_moves = None
+        return best_move
+
+    def search_root(self, game, moves):
+        # X maximiza y O minimiza la utilidad de X; las puntuaciones devueltas son
+        # desde el punto de vista de quien juega
+        maximizing = game.current_player == 'X'
+        sign = 1 if maximizing else -1
         best_score = float('-inf')
         best_move = None
         alpha = float('-inf')
         beta = float('inf')
-        for move in game.available_moves():
-            next_game = game.clone()
-            next_game.make_move(move)
-            score = self.alpha_beta(next_game, 0, False, alpha, beta)
+        scores = {}
+        for move in moves:
+            game.push(move)
+            score = sign * self.alpha_beta(game, 0, not maximizing, alpha, beta)
+            game.pop()
+            scores[move] = score
             if score > best_score:
                 best_score = score
                 best_move = move
-            alpha = max(alpha, best_score)
-        return best_move, self.nodes_explored
+            if maximizing:
+                alpha = max(alpha, best_score)
+            else:
+                beta = min(beta, -best_score)
+        return best_move, scores
 
     def alpha_beta(self, game: TicTacToe, depth: int, is_maximizing: bool, alpha: float, beta: float):
         self.nodes_explored += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
         if game.game_over:
             return game.get_utility()
-        if depth >= self.max_depth:
+        if depth >= self.search_depth:
             return game.evaluate_heuristic()
+        hash_move = None
+        if self.tt is not None:
+            key, sym = game.canonical_key
+            remaining = self.search_depth - depth
+            entry = self.tt.get(key)
+            if entry is None:
+                self.tt_misses += 1
+            else:
+                if entry[4] is not None:
+                    hash_move = from_canonical_cell(entry[4], sym)
+                if entry[1] < remaining:
+                    self.tt_misses += 1
+                else:
+                    self.tt_hits += 1
+                    _, _, value, flag, _ = entry
+                    if flag == EXACT:
+                        return value
+                    if flag == LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if beta <= alpha:
+                        return value
+            alpha_orig, beta_orig = alpha, beta
+        moves = game.available_moves()
+        if self.ordering is not None:
+            moves = self.ordering.order(game, moves, depth)
+        if self.pv_moves is not None:
+            # Jugada de la variante principal de la iteración anterior primero
+            pv_move = self.pv_moves.get(game.key)
+            if pv_move is not None:
+                moves.remove(pv_move)
+                moves.insert(0, pv_move)
+        if hash_move is not None:
+            # La mejor jugada guardada en la tabla de transposición va antes que todo
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        best_move = moves[0]
+        cutoff_index = None
         if is_maximizing:
             best_score = float('-inf')
-            for move in game.available_moves():
-                next_game = game.clone()
-                next_game.make_move(move)
-                score = self.alpha_beta(next_game, depth + 1, False, alpha, beta)
-                best_score = max(best_score, score)
+            for i, move in enumerate(moves):
+                game.push(move)
+                score = self.alpha_beta(game, depth + 1, False, alpha, beta)
+                game.pop()
+                if score > best_score:
+                    best_score = score
+                    best_move = move
                 alpha = max(alpha, best_score)
                 if beta <= alpha:
+                    cutoff_index = i
                     break
-            return best_score
         else:
             best_score = float('inf')
-            for move in game.available_moves():
-                next_game = game.clone()
-                next_game.make_move(move)
-                score = self.alpha_beta(next_game, depth + 1, True, alpha, beta)
-                best_score = min(best_score, score)
+            for i, move in enumerate(moves):
+                game.push(move)
+                score = self.alpha_beta(game, depth + 1, True, alpha, beta)
+                game.pop()
+                if score < best_score:
+                    best_score = score
+                    best_move = move
                 beta = min(beta, best_score)
                 if beta <= alpha:
+                    cutoff_index = i
                     break
-            return best_score
+        if cutoff_index is not None:
+            self.cutoffs += 1
+            if cutoff_index == 0:
+                self.first_move_cutoffs += 1
+            if self.stats is not None:
+                self.stats.cutoff(depth)
+            if self.ordering is not None:
+                self.ordering.record_cutoff(game, best_move, depth, self.search_depth - depth)
+        if self.pv_moves is not None:
+            self.pv_moves[game.key] = best_move
+        if self.tt is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER
+            elif best_score >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.tt.store(key, remaining, best_score, flag, to_canonical_cell(best_move, sym))
+        return best_score
+
+# Anchura de la ventana nula: menor que la diferencia entre dos valores distintos de la heurística
+NULL_WINDOW = 1e-9
+
+class PVSPlayer:
+    """
+    Alfa-beta en forma negamax con búsqueda de variante principal: la
+    primera jugada de cada nodo se busca con la ventana completa y el resto
+    con una ventana nula, que solo se repite con la ventana completa si la
+    jugada la supera. A igual profundidad y ordenación elige las mismas
+    jugadas que AlphaBetaPlayer, para X o para O. Con `aspiration` la
+    raíz se busca primero en una ventana de ese radio alrededor de la
+    puntuación de la jugada anterior de la misma partida y, si el
+    resultado cae fuera, se repite abriendo solo el lado que falló. La tabla de transposición guarda los
+    valores desde el punto de vista de X, igual que AlphaBetaPlayer.
+    """
+    def __init__(self, max_depth=3, backend=None, transposition_table=None, ordering=None,
+                 aspiration=None, stats=None):
+        self.max_depth = max_depth
+        self.backend = backend
+        self.tt = transposition_table
+        self.ordering = ordering
+        self.aspiration = aspiration
+        self.stats = stats
+        self.last_score = None
+        self.last_free = None
+        self.nodes_explored = 0
+        self.researches = 0
+        self.cutoffs = 0
+
+    def get_move(self, game: TicTacToe):
+        self.nodes_explored = 0
+        self.researches = 0
+        self.cutoffs = 0
+        game = begin_stats(self, as_backend(game, self.backend))
+        moves = game.available_moves()
+        if self.ordering is not None:
+            moves = self.ordering.order(game, moves, -1)
+        alpha, beta = float('-inf'), float('inf')
+        # Con tantas casillas libres como en la llamada anterior es otra partida
+        if (self.aspiration is not None and self.last_score is not None
+                and len(moves) < self.last_free):
+            alpha, beta = self.last_score - self.aspiration, self.last_score + self.aspiration
+        best_move, best_score = self.search_root(game, moves, alpha, beta)
+        # Fuera de la ventana de aspiración solo se abre el lado que falló
+        if best_score >= beta:
+            self.researches += 1
+            best_move, best_score = self.search_root(game, moves, best_score - NULL_WINDOW,
+                                                     float('inf'))
+        elif best_score <= alpha:
+            self.researches += 1
+            best_move, best_score = self.search_root(game, moves, float('-inf'),
+                                                     best_score + NULL_WINDOW)
+        self.last_score = best_score
+        self.last_free = len(moves)
+        if self.stats is not None:
+            self.stats.end_move(self.nodes_explored)
+        return best_move, self.nodes_explored
+
+    def search_root(self, game, moves, alpha, beta):
+        # Ventana y puntuación desde el punto de vista de quien juega en la raíz
+        color = 1 if game.current_player == 'X' else -1
+        best_score = float('-inf')
+        best_move = None
+        for i, move in enumerate(moves):
+            game.push(move)
+            score = self.pvs(game, 0, alpha, beta, -color, i == 0)
+            game.pop()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, best_score)
+            if alpha >= beta:
+                break
+        return best_move, best_score
+
+    def pvs(self, game, depth, alpha, beta, color, first):
+        # Puntuación del hijo vista desde el padre; `color` es el signo del hijo.
+        # Las hojas se evalúan una sola vez: una ventana nula no ahorraría nada
+        if first or game.game_over or depth >= self.max_depth:
+            return -self.negamax(game, depth, -beta, -alpha, color)
+        score = -self.negamax(game, depth, -alpha - NULL_WINDOW, -alpha, color)
+        if alpha < score < beta:
+            # Fallo alto: score es una cota inferior, basta repetir en (score, beta)
+            self.researches += 1
+            score = -self.negamax(game, depth, -beta, -score, color)
+        return score
+
+    def negamax(self, game: TicTacToe, depth: int, alpha: float, beta: float, color: int):
+        self.nodes_explored += 1
+        if game.game_over:
+            return color * game.get_utility()
+        if depth >= self.max_depth:
+            return color * game.evaluate_heuristic()
+        hash_move = None
+        if self.tt is not None:
+            key, sym = game.canonical_key
+            remaining = self.max_depth - depth
+            entry = self.tt.get(key)
+            if entry is not None:
+                if entry[4] is not None:
+                    hash_move = from_canonical_cell(entry[4], sym)
+                if entry[1] >= remaining:
+                    _, _, value, flag, _ = entry
+                    # Cota de X -> cota de negamax: con color -1 se invierte el sentido
+                    value *= color
+                    if color < 0 and flag != EXACT:
+                        flag = UPPER if flag == LOWER else LOWER
+                    if flag == EXACT:
+                        return value
+                    if flag == LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if alpha >= beta:
+                        return value
+            alpha_orig, beta_orig = alpha, beta
+        moves = game.available_moves()
+        if self.ordering is not None:
+            moves = self.ordering.order(game, moves, depth)
+        if hash_move is not None:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        best_score = float('-inf')
+        best_move = moves[0]
+        for i, move in enumerate(moves):
+            game.push(move)
+            score = self.pvs(game, depth + 1, alpha, beta, -color, i == 0)
+            game.pop()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, best_score)
+            if alpha >= beta:
+                self.cutoffs += 1
+                if self.stats is not None:
+                    self.stats.cutoff(depth)
+                if self.ordering is not None:
+                    self.ordering.record_cutoff(game, move, depth, self.max_depth - depth)
+                break
+        if self.tt is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER if color > 0 else LOWER
+            elif best_score >= beta_orig:
+                flag = LOWER if color > 0 else UPPER
+            else:
+                flag = EXACT
+            self.tt.store(key, remaining, color * best_score, flag, to_canonical_cell(best_move, sym))
+        return best_score
+
+class MCTSNode:
+    def __init__(self, state: TicTacToe, parent=None, move=None):
+        self.state = state
+        self.parent = parent
+        self.move = move
+        self.children = []
+        self.untried_moves = state.available_moves()
+        self.visits = 0
+        self.total_value = 0.0
+        # Estadísticas AMAF (all-moves-as-first) de la jugada que lleva a este nodo
+        self.amaf_visits = 0
+        self.amaf_value = 0.0
+
+    def uct_select_child(self, c_param: float, rave=None):
+        # Selecciona el hijo con el mayor valor UCT; log(visitas) se calcula una vez por nodo.
+        # Los valores son de X: si en este nodo juega O se usan negados
+        log_visits = math.log(self.visits)
+        sign = 1 if self.state.current_player == 'X' else -1
+        best, best_value = None, -math.inf
+        for child in self.children:
+            value = sign * child.total_value / child.visits
+            if rave and child.amaf_visits:
+                # RAVE: mezcla con AMAF, con peso beta = sqrt(k / (3n + k)) que decae con las visitas
+                beta = math.sqrt(rave / (3 * child.visits + rave))
+                value += beta * (sign * child.amaf_value / child.amaf_visits - value)
+            value += c_param * math.sqrt(2 * log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def add_child(self, move, state: TicTacToe):
+        # Expande un nodo para el movimiento dado
+        child = MCTSNode(state, parent=self, move=move)
+        self.untried_moves.remove(move)
+        self.children.append(child)
+        return child
+
+    def update(self, value: float):
+        # Actualiza estadísticas tras simulación
+        self.visits += 1
+        self.total_value += value
+
+    def add_virtual_loss(self, loss: float):
+        # Penaliza temporalmente el nodo, para quien juega la jugada que lleva a él,
+        # para que otros hilos exploren otras ramas
+        self.visits += 1
+        self.total_value -= loss if self.state.current_player == 'O' else -loss
+
+    def revert_virtual_loss(self, value: float, loss: float):
+        # La visita ya se contó al aplicar la pérdida virtual
+        self.total_value += value + (loss if self.state.current_player == 'O' else -loss)
+
+    def update_amaf(self, final, value: float):
+        # Los hijos cuya jugada hizo después, en cualquier momento de la simulación, el
+        # jugador en turno aquí reciben el resultado como si se hubiera jugado primero
+        # Las máscaras van por filas: casilla (i, j) -> bit i * columnas + j (MNKGame tiene `cols`)
+        x, o = self.state.masks()
+        played = final[0] & ~x if self.state.current_player == 'X' else final[1] & ~o
+        cols = getattr(self.state, 'cols', 3)
+        for child in self.children:
+            i, j = child.move
+            if played >> (i * cols + j) & 1:
+                child.amaf_visits += 1
+                child.amaf_value += value
+
+def _root_search(player, game, seed):
+    # Búsqueda independiente ejecutada en un proceso del pool (paralelización en la raíz)
+    random.seed(seed)
+    return player._search_visits(game), player.nodes_explored
+
+class SharedTree:
+    """
+    Tabla posición (hash de Zobrist) -> MCTSNode que persiste entre
+    búsquedas y partidas (MCTSPlayer(tree=...)), como la tabla de
+    transposición de AlphaBetaPlayer. Si antes de una búsqueda tiene
+    `capacity` nodos o más, se vacía, así que la memoria queda acotada.
+    """
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.nodes = {}
+        self.resets = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, key):
+        return self.nodes.get(key)
+
+    def add(self, key, node):
+        self.nodes.setdefault(key, node)
+
+    def trim(self):
+        if len(self.nodes) >= self.capacity:
+            self.nodes.clear()
+            self.resets += 1
+
+    def clear(self):
+        self.nodes.clear()
+
+class MCTSPlayer:
+    def __init__(self, num_simulations=50, c_param=1.4, backend=None, rollouts_per_leaf=None,
+                 workers=1, parallel='root', virtual_loss=1.0, reuse_tree=False, shared_tree=False,
+                 storage='objects', rollout_policy=None, rave=None, tree=None, stats=None):
+        self.num_simulations = num_simulations
+        self.c_param = c_param
+        self.backend = backend
+        # Si se indica, cada hoja se evalúa con N partidas aleatorias vectorizadas
+        self.rollouts_per_leaf = rollouts_per_leaf
+        # workers > 1 activa la búsqueda paralela:
+        #   'root': un árbol independiente por proceso, se suman las visitas de la raíz
+        #   'tree': un único árbol compartido entre hilos con pérdida virtual
+        self.workers = workers
+        self.parallel = parallel
+        self.virtual_loss = virtual_loss
+        # reuse_tree: conserva el subárbol de la jugada real entre turnos
+        # shared_tree: tabla posición -> nodo que persiste entre partidas; con `tree` se
+        # usa un SharedTree creado fuera, que sobrevive a este jugador (p. ej. entre los
+        # bloques de partidas de run_experiments)
+        self.reuse_tree = reuse_tree
+        self.tree = tree if tree is not None else SharedTree() if shared_tree else None
+        # 'arrays' usa common.tree.ArrayTree (sin estados por nodo) en lugar de MCTSNode
+        self.storage = storage
+        # Política de common.policy para la simulación; None juega jugadas uniformes
+        self.rollout_policy = rollout_policy if rollout_policy is not None else RolloutPolicy()
+        # rave=k activa RAVE en la selección (solo storage='objects'): k es el número de
+        # visitas con el que AMAF y la media del nodo pesan igual; None usa UCT puro
+        self.rave = rave
+        if storage == 'arrays':
+            # ArrayTree solo implementa la búsqueda secuencial (o en la raíz) con UCT puro
+            unsupported = [name for name, used in (
+                ("parallel='tree'", workers > 1 and parallel == 'tree'), ('reuse_tree', reuse_tree),
+                ('shared_tree', self.tree is not None), ('rave', rave is not None)) if used]
+            if unsupported:
+                raise ValueError(f"storage='arrays' no admite {', '.join(unsupported)}")
+        self.stats = stats
+        self.nodes_explored = 0
+        self._pool = None
+        self._last_root = None
+
+    def get_move(self, game: TicTacToe):
+        self.nodes_explored = 0
+        game = begin_stats(self, as_backend(game, self.backend))
+        if self.workers > 1 and self.parallel == 'root':
+            visits = self._root_parallel(game)
+        else:
+            visits = self._search_visits(game)
+
+        # Selecciona la jugada con más visitas
+        best_move = max(visits, key=visits.get)
+        if self.stats is not None:
+            self.stats.end_move(self.nodes_explored)
+        return best_move, self.nodes_explored
+
+    def get_moves(self, games):
+        """
+        Busca varias posiciones a la vez (p. ej. peticiones concurrentes de
+        common.server): en cada ronda cada árbol baja hasta una hoja y todas
+        las hojas se evalúan con una sola llamada a rollout_many, con
+        rollouts_per_leaf partidas por hoja (una si no se indica). Cada
+        posición usa un árbol nuevo. Devuelve una lista de (jugada, nodos).
+        """
+        import numpy as np
+        from common.rollout import rollout_many
+        rng = np.random.default_rng(random.getrandbits(64))
+        states = [as_backend(game, self.backend) for game in games]
+        roots = [MCTSNode(state.clone()) for state in states]
+        nodes = [0] * len(states)
+        self.nodes_explored = 0
+        for _ in range(self.num_simulations):
+            leaves = []
+            for i, (root, state) in enumerate(zip(roots, states)):
+                before = self.nodes_explored
+                leaves.append(self._select(root, state))
+                nodes[i] += self.nodes_explored - before
+            values = rollout_many(states, self.rollouts_per_leaf or 1, rng, self.rollout_policy)
+            for root, state, leaf, value in zip(roots, states, leaves, values.tolist()):
+                # Con rollouts vectorizados AMAF solo ve las jugadas del árbol
+                self._backpropagate(root, leaf, value, final=state.masks() if self.rave else None)
+                while state.history:
+                    state.pop()
+        results = []
+        for root, n in zip(roots, nodes):
+            visits = {child.move: child.visits for child in root.children}
+            results.append((max(visits, key=visits.get), n))
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _new_rng(self):
+        if not self.rollouts_per_leaf:
+            return None
+        import numpy as np
+        return np.random.default_rng(random.getrandbits(64))
+
+    def _search_visits(self, game):
+        if self.storage == 'arrays':
+            return self._search_arrays(game)
+        root = self._search(game)
+        return {child.move: child.visits for child in root.children}
+
+    def _search_arrays(self, game):
+        from common.tree import ArrayTree
+        tree = ArrayTree()
+        root = tree.add_root()
+        rng = self._new_rng()
+        for _ in range(self.num_simulations):
+            node = root
+            state = game
+
+            # SELECTION / EXPANSION: se baja por UCT hasta el primer hijo sin visitar
+            while not state.game_over:
+                if not tree.num_children[node]:
+                    tree.expand(node, state.available_moves())
+                unvisited = tree.unvisited_children(node)
+                if unvisited:
+                    node = random.choice(unvisited)
+                else:
+                    node = tree.uct_select_child(node, self.c_param,
+                                                 1 if state.current_player == 'X' else -1)
+                state.push(tree.moves[tree.move[node]])
+                self.nodes_explored += 1
+                if unvisited:
+                    break
+
+            # SIMULATION
+            result = self._playout(state, rng)
+
+            # BACKPROPAGATION
+            while node >= 0:
+                tree.update(node, result)
+                node = tree.parent[node]
+
+            while state.history:
+                state.pop()
+        if self.stats is not None:
+            self.stats.record_array_tree(tree, root)
+        return tree.child_visits(root)
+
+    def _playout(self, state, rng, chooser=random):
+        if self.rollouts_per_leaf:
+            from common.rollout import batch_rollout
+            return batch_rollout(state, self.rollouts_per_leaf, rng, self.rollout_policy)
+        policy = self.rollout_policy
+        if self.stats is not None:
+            self.stats.playout(True)
+        while not state.game_over:
+            state.push(policy.choose(state, chooser))
+        if self.stats is not None:
+            self.stats.playout(False)
+        return state.get_utility()
+
+    def _find_root(self, game):
+        key = game.key
+        if self.tree is not None:
+            node = self.tree.get(key)
+            if node is not None:
+                return node
+        if self.reuse_tree and self._last_root is not None:
+            # Baja por nuestra jugada y la respuesta del rival; los hermanos se descartan
+            for child in self._last_root.children:
+                for grandchild in child.children:
+                    if grandchild.state.key == key:
+                        grandchild.parent = None
+                        return grandchild
+        return None
+
+    def _search(self, game):
+        if self.tree is not None:
+            self.tree.trim()
+        root = self._find_root(game)
+        if root is None:
+            root = MCTSNode(game.clone())
+            if self.tree is not None:
+                self.tree.add(game.key, root)
+        if self.reuse_tree:
+            self._last_root = root
+        before = self.stats.tree_size(root) if self.stats is not None else 0
+        if self.workers > 1 and self.parallel == 'tree':
+            self._tree_parallel(root, game)
+        else:
+            rng = self._new_rng()
+            for _ in range(self.num_simulations):
+                self._simulate(root, game, rng)
+        if self.stats is not None:
+            self.stats.record_tree(root, before)
+        return root
+
+    def _root_parallel(self, game):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        worker = MCTSPlayer(self.num_simulations, self.c_param, None, self.rollouts_per_leaf,
+                            storage=self.storage, rollout_policy=self.rollout_policy, rave=self.rave)
+        futures = [self._pool.submit(_root_search, worker, game, random.getrandbits(32))
+                   for _ in range(self.workers)]
+        visits = {}
+        for future in futures:
+            child_visits, nodes = future.result()
+            self.nodes_explored += nodes
+            for move, n in child_visits.items():
+                visits[move] = visits.get(move, 0) + n
+        return visits
+
+    def _tree_parallel(self, root, game):
+        lock = threading.Lock()
+        per_worker = [self.num_simulations // self.workers] * self.workers
+        per_worker[0] += self.num_simulations % self.workers
+        seeds = [random.getrandbits(32) for _ in per_worker]
+
+        def run(simulations, seed):
+            local_random = random.Random(seed)
+            state = game.clone()
+            if self.rollouts_per_leaf:
+                import numpy as np
+                rng = np.random.default_rng(seed)
+            else:
+                rng = None
+            for _ in range(simulations):
+                self._simulate(root, state, rng, lock, local_random)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for future in [pool.submit(run, n, seed) for n, seed in zip(per_worker, seeds)]:
+                future.result()
+
+    def _simulate(self, root, state, rng, lock=None, chooser=random):
+        loss = self.virtual_loss if lock is not None else 0.0
+        node = self._select(root, state, lock, chooser, loss)
+
+        # SIMULATION
+        result = self._playout(state, rng, chooser)
+
+        self._backpropagate(root, node, result, lock, loss, state.masks() if self.rave else None)
+
+        # Deshace la simulación para reutilizar el mismo estado
+        while state.history:
+            state.pop()
+
+    def _select(self, root, state, lock=None, chooser=random, loss=0.0):
+        with lock if lock is not None else nullcontext():
+            node = root
+            if loss:
+                node.add_virtual_loss(loss)
+
+            # SELECTION
+            while not state.game_over and not node.untried_moves and node.children:
+                node = node.uct_select_child(self.c_param, self.rave)
+                state.push(node.move)
+                self.nodes_explored += 1
+                if loss:
+                    node.add_virtual_loss(loss)
+
+            # EXPANSION
+            if node.untried_moves:
+                move = chooser.choice(node.untried_moves)
+                state.push(move)
+                node = node.add_child(move, state.clone())
+                self.nodes_explored += 1
+                if self.tree is not None:
+                    self.tree.add(state.key, node)
+                if loss:
+                    node.add_virtual_loss(loss)
+        return node
+
+    def _backpropagate(self, root, node, result, lock=None, loss=0.0, final=None):
+        # BACKPROPAGATION (hasta la raíz de esta búsqueda, que puede tener padre si se reutiliza).
+        # `final` son las máscaras del tablero al acabar la simulación, para RAVE
+        with lock if lock is not None else nullcontext():
+            while True:
+                if loss:
+                    node.revert_virtual_loss(result, loss)
+                else:
+                    node.update(result)
+                if final is not None:
+                    node.update_amaf(final, result)
+                if node is root:
+                    break
+                node = node.parent
@@ -0,0 +1,64 @@
+from common.bitboard import FULL, LINES, MOVES, POPCOUNT
+
+# THREATS[m]: casillas que completan una línea en la que m ya tiene dos fichas
+THREATS = tuple(sum(1 << b for b in range(9)
+                    if any(l >> b & 1 and POPCOUNT[m & l & ~(1 << b)] == 2 for l in LINES))
+                for m in range(512))
+# Número de líneas que pasan por cada casilla: centro 4, esquinas 3, bordes 2
+LINE_COUNTS = tuple(sum(l >> b & 1 for l in LINES) for b in range(9))
+
+class RolloutPolicy:
+    """
+    Política de la fase de simulación de MCTSPlayer. `choose` elige la
+    jugada de una partida y `batch_keys` da, para los rollouts vectorizados
+    de common.rollout, una clave por casilla (se juega la mayor; las
+    ocupadas valen -1). La política base es la uniforme del MCTS original.
+    """
+    def choose(self, state, chooser):
+        return chooser.choice(state.available_moves())
+
+    def batch_keys(self, boards, turn, rng):
+        keys = rng.random(boards.shape)
+        keys[boards != 0] = -1.0
+        return keys
+
+class InformedPolicy(RolloutPolicy):
+    """
+    Gana si puede, si no bloquea la victoria inmediata del rival y, si no,
+    juega al azar con probabilidad proporcional a `weights` (por defecto,
+    las líneas que pasan por cada casilla). Solo para tableros 3x3.
+    """
+    def __init__(self, weights=LINE_COUNTS):
+        self.weights = tuple(weights)
+        self.exponents = tuple(1.0 / w for w in self.weights)
+        # Casillas libres -> (jugadas, pesos acumulados) para random.choices
+        self.free_moves = []
+        for free in range(512):
+            cells = [b for b in range(9) if free >> b & 1]
+            total, cum_weights = 0, []
+            for b in cells:
+                total += self.weights[b]
+                cum_weights.append(total)
+            self.free_moves.append((tuple(MOVES[b] for b in cells), tuple(cum_weights)))
+
+    def choose(self, state, chooser):
+        x, o = state.masks()
+        own, other = (x, o) if state.current_player == 'X' else (o, x)
+        free = FULL & ~(x | o)
+        urgent = THREATS[own] & free or THREATS[other] & free
+        if urgent:
+            return MOVES[(urgent & -urgent).bit_length() - 1]
+        moves, cum_weights = self.free_moves[free]
+        return chooser.choices(moves, cum_weights=cum_weights)[0]
+
+    def batch_keys(self, boards, turn, rng):
+        from common.rollout import LINE_MATRIX
+        # Suma de cada línea desde el punto de vista de quien juega: 2 = victoria, -2 = bloqueo
+        sums = (boards @ LINE_MATRIX) * turn[:, None]
+        wins = (sums == 2).astype(boards.dtype) @ LINE_MATRIX.T
+        blocks = (sums == -2).astype(boards.dtype) @ LINE_MATRIX.T
+        # u^(1/w) con u uniforme: la mayor clave sale con probabilidad proporcional a w
+        keys = rng.random(boards.shape) ** self.exponents
+        keys += 4.0 * (wins > 0) + 2.0 * (blocks > 0)
+        keys[boards != 0] = -1.0
+        return keys
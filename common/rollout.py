@@ -0,0 +1,55 @@
+import numpy as np
+
+from common.bitboard import LINES, game_masks
+from common.policy import RolloutPolicy
+
+# LINE_MATRIX[celda, línea] = 1 si la celda pertenece a la línea
+LINE_MATRIX = np.array([[line >> b & 1 for line in LINES] for b in range(9)], dtype=np.int8)
+
+UNIFORM = RolloutPolicy()
+
+def batch_rollout(game, n, rng=None, policy=None):
+    """
+    Juega n partidas aleatorias a la vez desde `game` sobre un tensor (n, 9)
+    con X=+1 y O=-1, y devuelve la utilidad media desde el punto de vista de X.
+    Las jugadas las elige `policy` (common.policy); por defecto, uniformes.
+    """
+    return float(rollout_many([game], n, rng, policy)[0])
+
+def rollout_many(games, n, rng=None, policy=None):
+    """
+    batch_rollout para varias posiciones: las n partidas de cada posición
+    se juegan todas juntas en un tensor (len(games) * n, 9). Cada fila
+    lleva su propio turno, así que las posiciones pueden tener distinto
+    jugador en turno. Devuelve un array con la utilidad media de cada una.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    policy = policy if policy is not None else UNIFORM
+    values = np.zeros(len(games))
+    live = [i for i, game in enumerate(games) if not game.game_over]
+    for i, game in enumerate(games):
+        if game.game_over:
+            values[i] = game.get_utility()
+    if not live:
+        return values
+    masks = np.array([game_masks(games[i]) for i in live])
+    bits = masks[:, :, None] >> np.arange(9) & 1
+    boards = np.repeat((bits[:, 0] - bits[:, 1]).astype(np.int8), n, axis=0)
+    turn = np.repeat(np.array([1 if games[i].current_player == 'X' else -1 for i in live],
+                              dtype=np.int8), n)
+    result = np.zeros(len(boards), dtype=np.int8)
+    active = np.arange(len(boards))
+
+    # Todas las partidas activas avanzan a la vez; cada fila alterna su propio turno
+    while active.size:
+        sub = boards[active]
+        t = turn[active]
+        keys = policy.batch_keys(sub, t, rng)
+        sub[np.arange(active.size), keys.argmax(axis=1)] = t
+        boards[active] = sub
+        won = (sub @ LINE_MATRIX == 3 * t[:, None]).any(axis=1)
+        result[active[won]] = t[won]
+        active = active[~(won | (sub != 0).all(axis=1))]
+        turn = -turn
+    values[live] = result.reshape(len(live), n).mean(axis=1)
+    return values
@@ -0,0 +1,71 @@
+import random
+import time
+
+import numpy as np
+
+from common.bitboard import BitboardTicTacToe
+from common.rollout import LINE_MATRIX
+
+WEIGHTS = 1 << np.arange(9)
+
+def run_batched(player, num_games=1000, first_player='X', seed=None, game_cls=BitboardTicTacToe):
+    """
+    Juega `num_games` partidas a la vez del jugador (X) contra un oponente
+    aleatorio (O) sobre un array (G, 3, 3) con X=+1 y O=-1. Todas las
+    partidas avanzan a la par, así que comparten el turno: las jugadas del
+    oponente se generan para todas en un solo paso vectorizado y solo se
+    llama al jugador, partida a partida, cuando le toca a X.
+    """
+    rng = np.random.default_rng(seed)
+    if seed is not None:
+        random.seed(seed)
+    boards = np.zeros((num_games, 3, 3), dtype=np.int8)
+    flat = boards.reshape(num_games, 9)
+    result = np.zeros(num_games, dtype=np.int8)
+    active = np.arange(num_games)
+    turn = first_player
+    total_nodes = 0
+    total_moves = 0
+    search_time = 0.0
+    start_time = time.perf_counter()
+
+    while active.size:
+        sub = flat[active]
+        if turn == 'X':
+            x_masks = ((sub == 1) @ WEIGHTS).tolist()
+            o_masks = ((sub == -1) @ WEIGHTS).tolist()
+            cells = np.empty(active.size, dtype=np.int64)
+            search_start = time.perf_counter()
+            for i, (x, o) in enumerate(zip(x_masks, o_masks)):
+                game = BitboardTicTacToe.from_masks(x, o, 'X')
+                if game_cls is not BitboardTicTacToe:
+                    game = game_cls.from_game(game)
+                move, nodes = player.get_move(game)
+                cells[i] = move[0] * 3 + move[1]
+                total_nodes += nodes
+            search_time += time.perf_counter() - search_start
+            total_moves += active.size
+            value = 1
+        else:
+            keys = rng.random(sub.shape)
+            keys[sub != 0] = -1.0
+            cells = keys.argmax(axis=1)
+            value = -1
+        sub[np.arange(active.size), cells] = value
+        flat[active] = sub
+        won = (sub @ LINE_MATRIX == 3 * value).any(axis=1)
+        result[active[won]] = value
+        active = active[~(won | (sub != 0).all(axis=1))]
+        turn = 'O' if turn == 'X' else 'X'
+
+    total_time = time.perf_counter() - start_time
+    return {
+        'wins': int((result == 1).sum()),
+        'losses': int((result == -1).sum()),
+        'draws': int((result == 0).sum()),
+        'avg_nodes': total_nodes / num_games,
+        'avg_time': search_time / num_games,
+        'total_moves': total_moves,
+        'total_experiment_time': total_time,
+        'games_per_sec': num_games / total_time,
+    }
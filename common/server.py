@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from common.engine import PLAYER_NAMES, parse_board, search_batch
+
+class MoveServer:
+    """
+    Sirve peticiones `bestmove` de muchas partidas a la vez. Las búsquedas
+    se ejecutan en un pool de procesos; las peticiones de la misma posición
+    y configuración que ya están pendientes se unen a esa búsqueda en lugar
+    de lanzar otra. Un despachador saca lotes de la cola cuando hay un
+    proceso libre, así que bajo carga cada lote agrupa más peticiones (y
+    las de MCTS con rollouts vectorizados comparten una sola evaluación
+    por ronda, ver MCTSPlayer.get_moves).
+    """
+    def __init__(self, player='alphabeta', param=None, rollouts=None, workers=None, batch_size=32):
+        self.defaults = (player, param, rollouts)
+        self.workers = workers or os.cpu_count()
+        self.batch_size = batch_size
+        self.pool = None
+        self.queue = None
+        # (x, o, jugador en turno, nombre, param, rollouts) -> Future de la búsqueda en curso
+        self.pending = {}
+        self.latencies = deque(maxlen=10000)
+        self.requests = 0
+        self.searches = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.in_flight = 0
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        self._dispatcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    async def bestmove(self, board, to_move=None, player=None, param=None, rollouts=None):
+        start = time.perf_counter()
+        self.requests += 1
+        # Los campos que no vienen en la petición toman el valor por defecto del servidor
+        default_player, default_param, default_rollouts = self.defaults
+        player = default_player if player is None else player
+        param = default_param if param is None else param
+        rollouts = default_rollouts if rollouts is None else rollouts
+        if player not in PLAYER_NAMES:
+            raise ValueError(f"jugador desconocido: {player!r}")
+        if to_move not in (None, 'X', 'O'):
+            raise ValueError(f"jugador en turno inválido: {to_move!r}")
+        # Se valida aquí y no en el pool: un error en la búsqueda solo afecta a su petición,
+        # pero así ni siquiera llega a encolarse
+        for name, value in (('param', param), ('rollouts', rollouts)):
+            if value is not None and (type(value) is not int or value <= 0):
+                raise ValueError(f"{name} debe ser un entero positivo: {value!r}")
+        game = parse_board(board, to_move)
+        if game.game_over:
+            raise ValueError("partida terminada")
+        x, o = game.masks()
+        job = (x, o, game.current_player, player, param, rollouts)
+        future = self.pending.get(job)
+        if future is None:
+            future = self.pending[job] = asyncio.get_running_loop().create_future()
+            self.queue.put_nowait(job)
+        else:
+            self.coalesced += 1
+        # shield: si un cliente se desconecta no se cancela la búsqueda compartida
+        move, nodes = await asyncio.shield(future)
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        return move, nodes, latency
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            jobs = [await self.queue.get()]
+            # El lote se reparte entre los procesos: no se lleva más de lo que le toca
+            limit = min(self.batch_size, -(-(self.queue.qsize() + 1) // self.workers))
+            while len(jobs) < limit and not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+            self.in_flight += len(jobs)
+            self.searches += len(jobs)
+            self.batches += 1
+            task = loop.run_in_executor(self.pool, search_batch, jobs)
+            task.add_done_callback(partial(self._finish, jobs))
+
+    def _finish(self, jobs, task):
+        self._slots.release()
+        self.in_flight -= len(jobs)
+        try:
+            results = task.result()
+        except Exception as e:
+            for job in jobs:
+                self.pending.pop(job).set_exception(e)
+            return
+        for job, result in zip(jobs, results):
+            future = self.pending.pop(job)
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+
+        def ms(q):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else 0.0
+
+        return {
+            'queue_depth': self.queue.qsize(),
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'searches': self.searches,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'p50_ms': ms(0.50),
+            'p95_ms': ms(0.95),
+            'p99_ms': ms(0.99),
+            'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+    async def respond(self, line):
+        # Una petición JSON por línea: {"id", "board", "to_move", "player", "param", "rollouts"}
+        # o {"cmd": "stats"}; la respuesta lleva el mismo id
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("la petición debe ser un objeto JSON")
+            if request.get('cmd') == 'stats':
+                response = self.stats()
+            else:
+                move, nodes, latency = await self.bestmove(
+                    request['board'], request.get('to_move'), request.get('player'),
+                    request.get('param'), request.get('rollouts'))
+                response = {'move': list(move), 'nodes': nodes, 'latency_ms': latency * 1000,
+                            'queue_depth': self.queue.qsize()}
+        except (ValueError, KeyError, TypeError) as e:
+            response = {'error': str(e)}
+        except Exception as e:
+            # Cualquier otro fallo (p. ej. en la búsqueda de un proceso del pool) también se responde
+            response = {'error': f"{type(e).__name__}: {e}"}
+        if isinstance(request, dict) and 'id' in request:
+            response['id'] = request['id']
+        return json.dumps(response, ensure_ascii=False)
+
+    async def serve_stream(self, reader, write):
+        # Las respuestas se escriben según terminan, no en el orden de llegada
+        tasks = set()
+
+        async def answer(line):
+            write(await self.respond(line) + '\n')
+
+        async for line in reader:
+            if line.strip():
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+async def serve(server, tcp=None, unix=None):
+    await server.start()
+    try:
+        async def client(reader, writer):
+            await server.serve_stream(reader, lambda text: writer.write(text.encode()))
+            writer.close()
+
+        if tcp is not None:
+            host, _, port = tcp.rpartition(':')
+            listener = await asyncio.start_server(client, host or '127.0.0.1', int(port))
+        elif unix is not None:
+            listener = await asyncio.start_unix_server(client, unix)
+        else:
+            reader = asyncio.StreamReader()
+            await asyncio.get_running_loop().connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+            def write(text):
+                sys.stdout.write(text)
+                sys.stdout.flush()
+
+            await server.serve_stream(reader, write)
+            return
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,140 @@
+import mmap
+import os
+import tempfile
+from array import array
+
+from common.bitboard import FULL, MOVES, WINNING, game_masks
+
+MAGIC = b'TTTS'
+SIZE = 3 ** 9 * 2
+UNKNOWN = 127
+# Cabecera, un valor (1 byte) y un conjunto de jugadas (2 bytes) por índice
+FILE_SIZE = len(MAGIC) + SIZE * 3
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solution.bin')
+
+# Contribución en base 3 de cada máscara: X suma 1·3^b y O suma 2·3^b
+BASE3 = tuple(sum(3 ** b for b in range(9) if m >> b & 1) for m in range(512))
+
+def position_index(x, o, player):
+    return (BASE3[x] + 2 * BASE3[o]) << 1 | (player == 'O')
+
+class SolutionTable:
+    """
+    Valor teórico (+1/0/-1 desde el punto de vista de X) y conjunto de
+    jugadas óptimas (máscara de 9 bits) de cada posición legal, indexados
+    por position_index.
+    """
+    def __init__(self, values, moves):
+        self.values = values
+        self.moves = moves
+
+    @classmethod
+    def build(cls):
+        values = array('b', [UNKNOWN]) * SIZE
+        moves = array('H', [0]) * SIZE
+
+        # Enumerar el grafo completo desde el tablero vacío con ambos jugadores iniciales
+        layers = [set() for _ in range(10)]
+        stack = [(0, 0, 'X'), (0, 0, 'O')]
+        seen = set()
+        while stack:
+            x, o, player = stack.pop()
+            if (x, o, player) in seen:
+                continue
+            seen.add((x, o, player))
+            layers[bin(x | o).count('1')].add((x, o, player))
+            if WINNING[x] or WINNING[o] or x | o == FULL:
+                continue
+            for b in range(9):
+                if not (x | o) >> b & 1:
+                    if player == 'X':
+                        stack.append((x | 1 << b, o, 'O'))
+                    else:
+                        stack.append((x, o | 1 << b, 'X'))
+
+        # Análisis retrógrado: de los tableros más llenos hacia el vacío
+        for layer in reversed(layers):
+            for x, o, player in layer:
+                i = position_index(x, o, player)
+                if WINNING[x]:
+                    values[i] = 1
+                    continue
+                if WINNING[o]:
+                    values[i] = -1
+                    continue
+                if x | o == FULL:
+                    values[i] = 0
+                    continue
+                child_values = {}
+                for b in range(9):
+                    if not (x | o) >> b & 1:
+                        if player == 'X':
+                            child_values[b] = values[position_index(x | 1 << b, o, 'O')]
+                        else:
+                            child_values[b] = values[position_index(x, o | 1 << b, 'X')]
+                best = (max if player == 'X' else min)(child_values.values())
+                values[i] = best
+                moves[i] = sum(1 << b for b, v in child_values.items() if v == best)
+        return cls(values, moves)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            # Un fichero vacío o truncado no se puede usar (ni mapear, si está vacío)
+            if os.fstat(f.fileno()).st_size != FILE_SIZE:
+                raise ValueError(f"{path} no es una tabla de solución válida")
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buf[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} no es una tabla de solución válida")
+        view = memoryview(buf)[len(MAGIC):]
+        return cls(view[:SIZE].cast('b'), view[SIZE:SIZE * 3].cast('H'))
+
+    def save(self, path=DEFAULT_PATH):
+        # Se escribe en un temporal del mismo directorio y se renombra: otro proceso que
+        # cargue la tabla a la vez ve el fichero completo o ninguno
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(bytes(self.values))
+                f.write(bytes(self.moves))
+            # mkstemp crea el fichero solo legible por su dueño
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def value(self, game):
+        x, o = game_masks(game)
+        return self.values[position_index(x, o, game.current_player)]
+
+    def best_moves(self, game):
+        x, o = game_masks(game)
+        mask = self.moves[position_index(x, o, game.current_player)]
+        return [MOVES[b] for b in range(9) if mask >> b & 1]
+
+def load_or_build(path=DEFAULT_PATH):
+    # Usa la tabla serializada si existe y es válida; si no, la construye y la guarda
+    if path is not None and os.path.exists(path):
+        try:
+            return SolutionTable.load(path)
+        except ValueError:
+            pass
+    table = SolutionTable.build()
+    if path is not None:
+        table.save(path)
+    return table
+
+class SolvedPlayer:
+    def __init__(self, table=None, path=DEFAULT_PATH):
+        self.table = table if table is not None else load_or_build(path)
+        self.nodes_explored = 0
+
+    def get_move(self, game):
+        self.nodes_explored = 1
+        moves = self.table.best_moves(game)
+        if not moves:
+            raise ValueError("la posición no está en la tabla de solución "
+                             "(partida terminada o tablero imposible)")
+        return moves[0], self.nodes_explored
@@ -0,0 +1,48 @@
+from common.bitboard import CELL_MAPS, MOVES, SYMMETRIES, canonical
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+def canonical_position(game):
+    # Clave canónica (tablero reducido por simetría + jugador en turno) y simetría aplicada
+    x, o = game.masks()
+    key, sym = canonical(x, o)
+    return key << 1 | (game.current_player == 'O'), sym
+
+def to_canonical_cell(move, sym):
+    return CELL_MAPS[sym][move[0] * 3 + move[1]]
+
+def from_canonical_cell(cell, sym):
+    return MOVES[SYMMETRIES[sym][cell]]
+
+class TranspositionTable:
+    """
+    Tabla de transposición de tamaño fijo indexada por la clave canónica.
+    Cada ranura guarda (clave, profundidad restante, valor, tipo de cota,
+    mejor jugada en coordenadas canónicas o None);
+    una entrada se reemplaza si pertenece a otra posición o si la nueva
+    búsqueda es al menos igual de profunda (reemplazo por profundidad).
+    """
+    def __init__(self, size=65521):
+        self.size = size
+        self.slots = [None] * size
+        self.stores = 0
+
+    def get(self, key):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, value, flag, move=None):
+        i = key % self.size
+        entry = self.slots[i]
+        if entry is None or entry[0] != key or depth >= entry[1]:
+            self.slots[i] = (key, depth, value, flag, move)
+            self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.stores = 0
+
+    def __len__(self):
+        return sum(entry is not None for entry in self.slots)
@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+
+class ArrayTree:
+    """
+    Árbol de MCTS en forma de estructura de arrays: cada nodo es un índice
+    en arrays de NumPy preasignados (padre, jugada, visitas, valor total,
+    primer hijo y siguiente hermano). Al expandir un nodo se reservan todos
+    sus hijos en un bloque contiguo, de modo que UCT se calcula con una
+    sola expresión vectorizada sobre el bloque. No se guarda el estado de
+    cada nodo; el estado se reconstruye aplicando las jugadas desde la
+    raíz. Los arrays duplican su capacidad cuando se llenan.
+    """
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.move = np.full(capacity, -1, dtype=np.int32)
+        self.visits = np.zeros(capacity, dtype=np.int64)
+        self.total_value = np.zeros(capacity, dtype=np.float64)
+        # log(visits) de cada nodo, calculado una vez por actualización y no por hijo
+        self.log_visits = np.zeros(capacity, dtype=np.float64)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.next_sibling = np.full(capacity, -1, dtype=np.int32)
+        self.num_children = np.zeros(capacity, dtype=np.int32)
+        self.visited_children = np.zeros(capacity, dtype=np.int32)
+        self.size = 0
+        # Las jugadas se guardan como identificadores enteros
+        self.moves = []
+        self.move_ids = {}
+
+    def _grow(self, needed):
+        while self.capacity < needed:
+            self.capacity *= 2
+        for name, fill in (('parent', -1), ('move', -1), ('visits', 0), ('total_value', 0),
+                           ('log_visits', 0), ('first_child', -1), ('next_sibling', -1),
+                           ('num_children', 0), ('visited_children', 0)):
+            old = getattr(self, name)
+            new = np.full(self.capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def move_id(self, move):
+        move_id = self.move_ids.get(move)
+        if move_id is None:
+            move_id = self.move_ids[move] = len(self.moves)
+            self.moves.append(move)
+        return move_id
+
+    def add_root(self):
+        if self.size == self.capacity:
+            self._grow(self.size + 1)
+        node = self.size
+        self.size += 1
+        return node
+
+    def expand(self, node, moves):
+        # Reserva un bloque contiguo con un hijo por jugada legal
+        start, n = self.size, len(moves)
+        if start + n > self.capacity:
+            self._grow(start + n)
+        block = slice(start, start + n)
+        self.parent[block] = node
+        self.move[block] = [self.move_id(move) for move in moves]
+        self.next_sibling[block] = np.arange(start + 1, start + n + 1)
+        self.next_sibling[start + n - 1] = -1
+        self.first_child[node] = start
+        self.num_children[node] = n
+        self.size += n
+
+    def children(self, node):
+        start = self.first_child[node]
+        return range(start, start + self.num_children[node]) if start >= 0 else range(0)
+
+    def unvisited_children(self, node):
+        if self.visited_children[node] == self.num_children[node]:
+            return []
+        start = self.first_child[node]
+        return (start + np.flatnonzero(self.visits[start:start + self.num_children[node]] == 0)).tolist()
+
+    def uct_select_child(self, node, c_param, sign=1):
+        # Solo se llama con todos los hijos visitados, así que no hay divisiones por cero.
+        # Los valores son de X; sign = -1 cuando en el nodo juega O
+        start = self.first_child[node]
+        block = slice(start, start + self.num_children[node])
+        visits = self.visits[block]
+        uct = sign * self.total_value[block] / visits + c_param * np.sqrt(2 * self.log_visits[node] / visits)
+        return start + int(np.argmax(uct))
+
+    def update(self, node, value):
+        if not self.visits[node] and self.parent[node] >= 0:
+            self.visited_children[self.parent[node]] += 1
+        self.visits[node] += 1
+        self.total_value[node] += value
+        self.log_visits[node] = math.log(self.visits[node])
+
+    def child_visits(self, node):
+        return {self.moves[self.move[child]]: int(self.visits[child])
+                for child in self.children(node) if self.visits[child]}